@@ -1,18 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from typing import Callable
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from app.bot.context import ServiceContainer, get_services
-from app.services.analytics import AnalyticsSnapshot
-from app.reports.charts import generate_pie_chart, generate_heatmap, generate_daily_bar_chart
+from app.services.analytics import AnalyticsSnapshot, EventInterval, event_intervals
 
 logger = logging.getLogger(__name__)
 
+ANALYTICS_EVENTS_TTL = timedelta(minutes=5)
+
+_PIE_BUTTON = InlineKeyboardButton("📊 Розподіл по категоріях", callback_data="analytics_chart_pie")
+_HEATMAP_BUTTON = InlineKeyboardButton("🔥 Теплова карта", callback_data="analytics_chart_heatmap")
+_DAILY_BUTTON = InlineKeyboardButton("📈 Завантаженість по днях", callback_data="analytics_chart_daily")
+
+# Ключ: (є категорії, є події)
+_INSIGHTS_KEYBOARDS: dict[tuple[bool, bool], InlineKeyboardMarkup | None] = {
+    (True, True): InlineKeyboardMarkup([[_PIE_BUTTON], [_HEATMAP_BUTTON], [_DAILY_BUTTON]]),
+    (True, False): InlineKeyboardMarkup([[_PIE_BUTTON]]),
+    (False, True): InlineKeyboardMarkup([[_HEATMAP_BUTTON], [_DAILY_BUTTON]]),
+    (False, False): None,
+}
+
 
 async def insights_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     services = get_services(context)
@@ -38,55 +54,69 @@ async def _send_insights(
 ) -> None:
     telegram_id = update.effective_user.id
 
-    try:
-        snapshot = await services.analytics.compute_snapshot(telegram_id, days=days)
-    except Exception as exc:  # pragma: no cover
-        await update.effective_message.reply_text(f"Не вдалося побудувати зведення: {exc}")
+    # Зведення та список подій для кнопок графіків не залежать одне від одного
+    snapshot, intervals = await asyncio.gather(
+        services.analytics.compute_snapshot(telegram_id, days=days),
+        _load_intervals(context, services, telegram_id, days, refresh=True),
+        return_exceptions=True,
+    )
+    if isinstance(snapshot, BaseException):  # pragma: no cover
+        await update.effective_message.reply_text(f"Не вдалося побудувати зведення: {snapshot}")
         return
 
     text = _render_snapshot(snapshot)
     
-    # Створюємо inline keyboard з кнопками для графіків
-    keyboard_buttons = []
-    
-    # Кнопка для pie chart (якщо є категорії)
-    if snapshot.category_stats:
-        keyboard_buttons.append([InlineKeyboardButton("📊 Розподіл по категоріях", callback_data="analytics_chart_pie")])
-    
-    # Кнопка для heatmap та bar chart (завжди показуємо, якщо є події)
-    # Перевіряємо, чи є події для цих графіків
-    try:
-        tz = ZoneInfo(services.settings.timezone)
-        now = datetime.now(tz)
-        start = now - timedelta(days=days)
-        end = now
-        events = await services.calendar.list_events_between(
-            telegram_id,
-            start=start,
-            end=end,
-            max_results=250,
-        )
-        if events:
-            keyboard_buttons.append([InlineKeyboardButton("🔥 Теплова карта", callback_data="analytics_chart_heatmap")])
-            keyboard_buttons.append([InlineKeyboardButton("📈 Завантаженість по днях", callback_data="analytics_chart_daily")])
-    except Exception:
+    # Кнопки heatmap та bar chart показуємо, лише якщо є події
+    if isinstance(intervals, BaseException):
         # Якщо не вдалося отримати події, просто не додаємо ці кнопки
-        pass
+        context.user_data.pop("analytics_intervals", None)
+        has_events = False
+    else:
+        has_events = bool(intervals)
+    reply_markup = _INSIGHTS_KEYBOARDS[(bool(snapshot.category_stats), has_events)]
 
     # Зберігаємо snapshot в контексті для подальшого використання
     context.user_data["analytics_snapshot"] = snapshot
     context.user_data["analytics_days"] = days
+    context.user_data.pop("analytics_charts", None)
 
     # Відправляємо повідомлення з кнопками (якщо є що показати)
-    if keyboard_buttons:
-        reply_markup = InlineKeyboardMarkup(keyboard_buttons)
-        await update.effective_message.reply_text(
-            text,
-            reply_markup=reply_markup,
-        )
-    else:
-        # Якщо немає графіків, просто відправляємо текст
-        await update.effective_message.reply_text(text)
+    await update.effective_message.reply_text(text, reply_markup=reply_markup)
+
+
+async def _load_intervals(
+    context: ContextTypes.DEFAULT_TYPE,
+    services: ServiceContainer,
+    telegram_id: int,
+    days: int,
+    *,
+    refresh: bool = False,
+) -> list[EventInterval]:
+    """Повертає інтервали подій за останні `days` днів, перевикористовуючи вже завантажені."""
+    now = datetime.now(services.settings.tzinfo)
+
+    cached = context.user_data.get("analytics_intervals")
+    fetched_at = context.user_data.get("analytics_intervals_at")
+    if (
+        not refresh
+        and isinstance(cached, list)
+        and isinstance(fetched_at, datetime)
+        and fetched_at.date() == now.date()
+        and now - fetched_at < ANALYTICS_EVENTS_TTL
+    ):
+        return cached
+
+    events = await services.calendar.list_events_between(
+        telegram_id,
+        start=now - timedelta(days=days),
+        end=now,
+        max_results=250,
+    )
+    # Розбираємо start/end один раз, графіки далі працюють лише з кортежами
+    intervals = event_intervals(events)
+    context.user_data["analytics_intervals"] = intervals
+    context.user_data["analytics_intervals_at"] = now
+    return intervals
 
 
 def _render_snapshot(snapshot: AnalyticsSnapshot) -> str:
@@ -118,6 +148,53 @@ def _render_snapshot(snapshot: AnalyticsSnapshot) -> str:
     return "\n".join(lines)
 
 
+# matplotlib важкий, тому модуль графіків імпортуємо лише при першому натисканні
+def _render_pie(snapshot: AnalyticsSnapshot, intervals: list[EventInterval]) -> io.BytesIO | None:
+    from app.reports.charts import generate_pie_chart
+
+    return generate_pie_chart(snapshot.category_stats)
+
+
+def _render_heatmap(snapshot: AnalyticsSnapshot, intervals: list[EventInterval]) -> io.BytesIO | None:
+    from app.reports.charts import generate_heatmap
+
+    return generate_heatmap(intervals, days=snapshot.days)
+
+
+def _render_daily(snapshot: AnalyticsSnapshot, intervals: list[EventInterval]) -> io.BytesIO | None:
+    from app.reports.charts import generate_daily_bar_chart
+
+    return generate_daily_bar_chart(snapshot.day_totals)
+
+
+@dataclass(frozen=True, slots=True)
+class _ChartSpec:
+    render: Callable[[AnalyticsSnapshot, list[EventInterval]], io.BytesIO | None]
+    caption: str
+    empty_message: str
+    needs_events: bool = False
+
+
+_CHART_SPECS: dict[str, _ChartSpec] = {
+    "analytics_chart_pie": _ChartSpec(
+        render=_render_pie,
+        caption="📊 Розподіл по категоріях",
+        empty_message="Немає даних для графіка категорій.",
+    ),
+    "analytics_chart_heatmap": _ChartSpec(
+        render=_render_heatmap,
+        caption="🔥 Теплова карта продуктивності",
+        empty_message="Немає подій для теплової карти.",
+        needs_events=True,
+    ),
+    "analytics_chart_daily": _ChartSpec(
+        render=_render_daily,
+        caption="📈 Завантаженість по днях",
+        empty_message="Немає даних для графіка.",
+    ),
+}
+
+
 async def handle_analytics_chart_callback(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -136,109 +213,24 @@ async def handle_analytics_chart_callback(
         await query.answer("❌ Дані аналітики втрачені. Запусти /insights знову.", show_alert=True)
         return
 
-    try:
-        if data == "analytics_chart_pie":
-            # Pie chart для категорій
-            if not snapshot.category_stats:
-                await query.answer("Немає даних для графіка категорій.", show_alert=True)
-                return
-
-            chart_buf = generate_pie_chart(snapshot.category_stats)
-            if not chart_buf:
-                await query.answer("Не вдалося згенерувати графік.", show_alert=True)
-                return
-
-            await query.answer()
-            await query.message.reply_photo(
-                photo=chart_buf,
-                caption="📊 Розподіл по категоріях",
-            )
-
-        elif data == "analytics_chart_heatmap":
-            # Heatmap
-            tz = ZoneInfo(services.settings.timezone)
-            now = datetime.now(tz)
-            start = now - timedelta(days=days)
-            end = now
-
-            events = await services.calendar.list_events_between(
-                telegram_id,
-                start=start,
-                end=end,
-                max_results=250,
-            )
-
-            if not events:
-                await query.answer("Немає подій для теплової карти.", show_alert=True)
-                return
-
-            chart_buf = generate_heatmap(events, days=days)
-            if not chart_buf:
-                await query.answer("Не вдалося згенерувати графік.", show_alert=True)
-                return
-
-            await query.answer()
-            await query.message.reply_photo(
-                photo=chart_buf,
-                caption="🔥 Теплова карта продуктивності",
-            )
-
-        elif data == "analytics_chart_daily":
-            # Bar chart по днях
-            tz = ZoneInfo(services.settings.timezone)
-            now = datetime.now(tz)
-            start = now - timedelta(days=days)
-            end = now
-
-            events = await services.calendar.list_events_between(
-                telegram_id,
-                start=start,
-                end=end,
-                max_results=250,
-            )
-
-            if not events:
-                await query.answer("Немає подій для графіка.", show_alert=True)
-                return
-
-            # Генеруємо day_totals з подій
-            from app.services.analytics import _extract_datetime
-
-            day_totals: dict[str, float] = {}
-            for event in events:
-                if hasattr(event, 'start'):
-                    start_payload = event.start
-                    end_payload = event.end
-                else:
-                    start_payload = event.get("start")
-                    end_payload = event.get("end")
-
-                start_dt = _extract_datetime(start_payload)
-                end_dt = _extract_datetime(end_payload)
-                if not start_dt or not end_dt:
-                    continue
-
-                duration = (end_dt - start_dt).total_seconds() / 60
-                if duration <= 0:
-                    continue
-
-                day_key = start_dt.strftime("%a %d.%m")
-                day_totals[day_key] = day_totals.get(day_key, 0.0) + duration / 60
-
-            if not day_totals:
-                await query.answer("Немає даних для графіка.", show_alert=True)
-                return
+    spec = _CHART_SPECS.get(data)
+    if spec is None:
+        return
 
-            chart_buf = generate_daily_bar_chart(day_totals)
+    try:
+        # PNG кешуємо на час життя поточного snapshot, щоб не малювати той самий графік знову
+        rendered = context.user_data.setdefault("analytics_charts", {})
+        chart_png = rendered.get(data)
+        if chart_png is None:
+            intervals = await _load_intervals(context, services, telegram_id, days) if spec.needs_events else []
+            chart_buf = spec.render(snapshot, intervals)
             if not chart_buf:
-                await query.answer("Не вдалося згенерувати графік.", show_alert=True)
+                await query.answer(spec.empty_message, show_alert=True)
                 return
+            chart_png = rendered[data] = chart_buf.getvalue()
 
-            await query.answer()
-            await query.message.reply_photo(
-                photo=chart_buf,
-                caption="📈 Завантаженість по днях",
-            )
+        await query.answer()
+        await query.message.reply_photo(photo=chart_png, caption=spec.caption)
 
     except Exception as exc:
         logger.exception("Помилка генерації графіка: %s", exc)
@@ -1,17 +1,17 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
-from enum import Enum
-from typing import Any
+from typing import Any, Final, TypeVar
 
 from telegram.ext import ContextTypes
 
 from app.config.settings import Settings
 from app.db.repository import HabitRepository, UserRepository, get_session
 from app.services.free_slots import FreeSlot, FreeSlotService
-from app.schemas.calendar import EventDraft, EventUpdatePayload
-from app.services.gemini import GeminiService
+from app.schemas.calendar import CalendarEvent, EventDraft, EventUpdatePayload
+from app.services.gemini import EventProposal, GeminiService
 from app.services.google_calendar import GoogleCalendarService
 from app.services.habit_planner import HabitPlannerService
 from app.services.analytics import AnalyticsService
@@ -34,21 +34,27 @@ RESET_KEYWORDS = (
     "/cancel",
     "/stop",
 )
+_RESET_EXACT = frozenset(RESET_KEYWORDS)
+_RESET_PATTERN = re.compile(
+    "(?:" + "|".join(re.escape(phrase) for phrase in RESET_KEYWORDS if " " in phrase) + ")"
+    "|(?:^| )(?:" + "|".join(re.escape(phrase) for phrase in RESET_KEYWORDS) + r")(?: |\Z)"
+)
+_T = TypeVar("_T")
 
 
-class ContextKey(str, Enum):
-    LAST_EVENT = "last_event_context"
-    LAST_EVENT_LEGACY = "last_created_event"
-    AGENDA = "agenda_context"
-    PENDING_CREATE_CONFLICT = "pending_conflict"
-    PENDING_UPDATE_CONFLICT = "pending_update_conflict"
-    LAST_FREE_SLOTS = "last_free_slots"
-    LAST_EVENT_QUERY = "last_event_query"
-    PENDING_DELETE = "pending_delete"
-    PENDING_DELETE_LIST = "pending_delete_list"
-    PENDING_UPDATE_LIST = "pending_update_list"
-    PENDING_UPDATE_DATA = "pending_update_data"
-    PENDING_UPDATE_DETAIL = "pending_update_detail"
+class ContextKey:
+    LAST_EVENT: Final = "last_event_context"
+    LAST_EVENT_LEGACY: Final = "last_created_event"
+    AGENDA: Final = "agenda_context"
+    PENDING_CREATE_CONFLICT: Final = "pending_conflict"
+    PENDING_UPDATE_CONFLICT: Final = "pending_update_conflict"
+    LAST_FREE_SLOTS: Final = "last_free_slots"
+    LAST_EVENT_QUERY: Final = "last_event_query"
+    PENDING_DELETE: Final = "pending_delete"
+    PENDING_DELETE_LIST: Final = "pending_delete_list"
+    PENDING_UPDATE_LIST: Final = "pending_update_list"
+    PENDING_UPDATE_DATA: Final = "pending_update_data"
+    PENDING_UPDATE_DETAIL: Final = "pending_update_detail"
 
 
 @dataclass(slots=True)
@@ -56,6 +62,13 @@ class EventContext:
     event_id: str | None
     summary: str
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "EventContext":
+        return cls(
+            event_id=raw.get("id"),
+            summary=raw.get("summary") or "(без назви)",
+        )
+
 
 @dataclass(slots=True)
 class AgendaContext:
@@ -63,23 +76,65 @@ class AgendaContext:
     date_dt: datetime
     time_window: str
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "AgendaContext | None":
+        date_dt = raw.get("date_dt")
+        if isinstance(date_dt, str):
+            try:
+                date_dt = datetime.fromisoformat(date_dt)
+            except ValueError:
+                date_dt = None
+        if date_dt is None:
+            return None
+        return cls(
+            date=raw.get("date") or "",
+            date_dt=date_dt,
+            time_window=raw.get("time_window") or "full",
+        )
+
 
 @dataclass(slots=True)
 class PendingCreateConflict:
     draft: EventDraft
     conflict: dict[str, Any]
     reply_text: str = "Подію створено."
+    # Якщо задано, повторення, колір, Meet і нагадування ще не додані до draft
+    proposal: EventProposal | None = None
+    lower_text: str = ""
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingCreateConflict | None":
+        if not raw.get("event_payload"):
+            return None
+        try:
+            draft = EventDraft.from_dict(raw.get("event_payload", {}))
+        except Exception:
+            return None
+        return cls(
+            draft=draft,
+            conflict=raw.get("conflict", {}),
+            reply_text=raw.get("analysis_reply") or "Подію створено.",
+        )
 
 
 @dataclass(slots=True)
 class PendingUpdateConflict:
     event_id: str | None
     update: EventUpdatePayload
-    original_event: dict[str, Any]
+    original_event: CalendarEvent | dict[str, Any]
     conflict: dict[str, Any] | None = None
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingUpdateConflict":
+        return cls(
+            event_id=raw.get("event_id"),
+            update=EventUpdatePayload.from_dict(raw),
+            original_event=raw.get("original_event") or {},
+            conflict=raw.get("conflict"),
+        )
+
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class LastFreeSlotsRequest:
     duration: int
     date_from: str
@@ -105,10 +160,34 @@ class LastFreeSlotsRequest:
 
 @dataclass(slots=True)
 class LastFreeSlotsContext:
-    slots: list[FreeSlot | str]
+    slots: list[FreeSlot]
     request: LastFreeSlotsRequest
     awaiting_use: bool = False
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "LastFreeSlotsContext | None":
+        request_raw = raw.get("request") or {}
+        try:
+            duration = int(request_raw.get("duration"))
+        except (TypeError, ValueError):
+            return None
+        request = LastFreeSlotsRequest(
+            duration=duration,
+            date_from=request_raw.get("date_from") or "",
+            date_to=request_raw.get("date_to") or "",
+            preferred_window=request_raw.get("preferred_window"),
+            preferred_start=_safe_int(request_raw.get("preferred_start")),
+            preferred_end=_safe_int(request_raw.get("preferred_end")),
+            next_start=request_raw.get("next_start"),
+            cursor_history=list(request_raw.get("cursor_history") or []),
+        )
+        return cls(
+            # Рядки зі старого формату стану не можна використати як слот, тому відкидаємо їх
+            slots=[slot for slot in raw.get("slots") or [] if isinstance(slot, FreeSlot)],
+            request=request,
+            awaiting_use=bool(raw.get("awaiting_use")),
+        )
+
 
 @dataclass(slots=True)
 class PendingDeleteItem:
@@ -116,6 +195,14 @@ class PendingDeleteItem:
     summary: str
     start: str
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingDeleteItem":
+        return cls(
+            event_id=raw.get("event_id", ""),
+            summary=raw.get("summary", "(без назви)"),
+            start=raw.get("start", ""),
+        )
+
 
 @dataclass(slots=True)
 class PendingDeleteContext:
@@ -123,6 +210,14 @@ class PendingDeleteContext:
     summary: str
     start: str
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingDeleteContext":
+        return cls(
+            event_id=raw.get("event_id", ""),
+            summary=raw.get("summary", "(без назви)"),
+            start=raw.get("start", ""),
+        )
+
 
 @dataclass(slots=True)
 class PendingUpdateListItem:
@@ -131,6 +226,15 @@ class PendingUpdateListItem:
     start: str
     event_data: dict[str, Any]
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingUpdateListItem":
+        return cls(
+            event_id=raw.get("event_id", ""),
+            summary=raw.get("summary", "(без назви)"),
+            start=raw.get("start", ""),
+            event_data=raw.get("event_data") or {},
+        )
+
 
 @dataclass(slots=True)
 class PendingUpdateListContext:
@@ -142,6 +246,10 @@ class PendingUpdateListContext:
 class PendingUpdateDetail:
     keywords: str
 
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "PendingUpdateDetail":
+        return cls(keywords=raw.get("keywords", ""))
+
 
 @dataclass(slots=True)
 class ServiceContainer:
@@ -154,17 +262,30 @@ class ServiceContainer:
     free_slot_service: FreeSlotService
     analytics: AnalyticsService
     series_planner: SeriesPlannerService
+    _authorized_ids: set[int] = field(default_factory=set, init=False, repr=False)
 
     def has_credentials(self, telegram_id: int) -> bool:
+        # Облікові дані ніде не видаляються, тож кешуємо лише позитивну відповідь.
+        if telegram_id in self._authorized_ids:
+            return True
         with get_session() as session:
             user = self.user_repo.get_by_telegram_id(session, telegram_id)
-            return bool(user and user.credentials_json)
+            authorized = bool(user and user.credentials_json)
+        if authorized:
+            self._authorized_ids.add(telegram_id)
+        return authorized
 
 
 def get_services(context: ContextTypes.DEFAULT_TYPE) -> ServiceContainer:
     return context.application.bot_data["services"]
 
 
+def clear_free_slot_expectation(context: ContextTypes.DEFAULT_TYPE) -> None:
+    # Видаляємо ключ лише якщо він є, щоб не позначати user_data зміненими без потреби
+    if FREE_SLOT_EXPECTATION_KEY in context.user_data:
+        del context.user_data[FREE_SLOT_EXPECTATION_KEY]
+
+
 def reset_user_context(context: ContextTypes.DEFAULT_TYPE, preserve: tuple[str, ...] = ()) -> None:
     preserved = {key: context.user_data.get(key) for key in preserve}
     context.user_data.clear()
@@ -173,17 +294,26 @@ def reset_user_context(context: ContextTypes.DEFAULT_TYPE, preserve: tuple[str,
             context.user_data[key] = value
 
 
-def _coerce_event_context(raw: Any) -> EventContext | None:
-    if isinstance(raw, EventContext):
+def _coerce(raw: Any, cls: type[_T]) -> _T | None:
+    if isinstance(raw, cls):
         return raw
     if isinstance(raw, dict):
-        return EventContext(
-            event_id=raw.get("id"),
-            summary=raw.get("summary") or "(без назви)",
-        )
+        return cls.from_dict(raw)
     return None
 
 
+def _coerce_list(raw: Any, cls: type[_T]) -> list[_T]:
+    if not isinstance(raw, list):
+        return []
+    result: list[_T] = []
+    for item in raw:
+        if isinstance(item, cls):
+            result.append(item)
+        elif isinstance(item, dict):
+            result.append(cls.from_dict(item))
+    return result
+
+
 def set_last_event_context(
     context: ContextTypes.DEFAULT_TYPE,
     event_id: str | None,
@@ -192,15 +322,15 @@ def set_last_event_context(
     if not (event_id or summary):
         return
     payload = EventContext(event_id=event_id, summary=summary or "(без назви)")
-    context.user_data[ContextKey.LAST_EVENT.value] = payload
-    context.user_data[ContextKey.LAST_EVENT_LEGACY.value] = payload  # зворотна сумісність
+    context.user_data[ContextKey.LAST_EVENT] = payload
+    context.user_data[ContextKey.LAST_EVENT_LEGACY] = payload  # зворотна сумісність
 
 
 def get_last_event_context(context: ContextTypes.DEFAULT_TYPE) -> EventContext | None:
-    raw = context.user_data.get(ContextKey.LAST_EVENT.value) or context.user_data.get(
-        ContextKey.LAST_EVENT_LEGACY.value
+    raw = context.user_data.get(ContextKey.LAST_EVENT) or context.user_data.get(
+        ContextKey.LAST_EVENT_LEGACY
     )
-    return _coerce_event_context(raw)
+    return _coerce(raw, EventContext)
 
 
 def set_agenda_context(
@@ -208,35 +338,20 @@ def set_agenda_context(
     agenda: AgendaContext | None,
 ) -> None:
     if agenda is None:
-        context.user_data.pop(ContextKey.AGENDA.value, None)
+        context.user_data.pop(ContextKey.AGENDA, None)
     else:
-        context.user_data[ContextKey.AGENDA.value] = agenda
+        context.user_data[ContextKey.AGENDA] = agenda
 
 
 def get_agenda_context(context: ContextTypes.DEFAULT_TYPE) -> AgendaContext | None:
-    raw = context.user_data.get(ContextKey.AGENDA.value)
-    if isinstance(raw, AgendaContext):
-        return raw
-    if isinstance(raw, dict):
-        date = raw.get("date") or ""
-        date_dt = raw.get("date_dt")
-        time_window = raw.get("time_window") or "full"
-        if isinstance(date_dt, str):
-            try:
-                date_dt = datetime.fromisoformat(date_dt)
-            except ValueError:
-                date_dt = None
-        if date_dt is None:
-            return None
-        return AgendaContext(date=date, date_dt=date_dt, time_window=time_window)
-    return None
+    return _coerce(context.user_data.get(ContextKey.AGENDA), AgendaContext)
 
 
 def set_pending_create_conflict(
     context: ContextTypes.DEFAULT_TYPE,
     conflict: PendingCreateConflict | None,
 ) -> None:
-    key = ContextKey.PENDING_CREATE_CONFLICT.value
+    key = ContextKey.PENDING_CREATE_CONFLICT
     if conflict is None:
         context.user_data.pop(key, None)
     else:
@@ -244,28 +359,15 @@ def set_pending_create_conflict(
 
 
 def pop_pending_create_conflict(context: ContextTypes.DEFAULT_TYPE) -> PendingCreateConflict | None:
-    key = ContextKey.PENDING_CREATE_CONFLICT.value
-    raw = context.user_data.pop(key, None)
-    if isinstance(raw, PendingCreateConflict):
-        return raw
-    if isinstance(raw, dict) and raw.get("event_payload"):
-        try:
-            draft = EventDraft.from_dict(raw.get("event_payload", {}))
-        except Exception:
-            return None
-        return PendingCreateConflict(
-            draft=draft,
-            conflict=raw.get("conflict", {}),
-            reply_text=raw.get("analysis_reply") or "Подію створено.",
-        )
-    return None
+    raw = context.user_data.pop(ContextKey.PENDING_CREATE_CONFLICT, None)
+    return _coerce(raw, PendingCreateConflict)
 
 
 def set_pending_update_conflict(
     context: ContextTypes.DEFAULT_TYPE,
     conflict: PendingUpdateConflict | None,
 ) -> None:
-    key = ContextKey.PENDING_UPDATE_CONFLICT.value
+    key = ContextKey.PENDING_UPDATE_CONFLICT
     if conflict is None:
         context.user_data.pop(key, None)
     else:
@@ -273,26 +375,15 @@ def set_pending_update_conflict(
 
 
 def pop_pending_update_conflict(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdateConflict | None:
-    key = ContextKey.PENDING_UPDATE_CONFLICT.value
-    raw = context.user_data.pop(key, None)
-    if isinstance(raw, PendingUpdateConflict):
-        return raw
-    if isinstance(raw, dict):
-        update_payload = EventUpdatePayload.from_dict(raw)
-        return PendingUpdateConflict(
-            event_id=raw.get("event_id"),
-            update=update_payload,
-            original_event=raw.get("original_event") or {},
-            conflict=raw.get("conflict"),
-        )
-    return None
+    raw = context.user_data.pop(ContextKey.PENDING_UPDATE_CONFLICT, None)
+    return _coerce(raw, PendingUpdateConflict)
 
 
 def set_last_free_slots(
     context: ContextTypes.DEFAULT_TYPE,
     state: LastFreeSlotsContext | None,
 ) -> None:
-    key = ContextKey.LAST_FREE_SLOTS.value
+    key = ContextKey.LAST_FREE_SLOTS
     if state is None:
         context.user_data.pop(key, None)
     else:
@@ -300,33 +391,7 @@ def set_last_free_slots(
 
 
 def get_last_free_slots(context: ContextTypes.DEFAULT_TYPE) -> LastFreeSlotsContext | None:
-    raw = context.user_data.get(ContextKey.LAST_FREE_SLOTS.value)
-    return _coerce_last_free_slots(raw)
-
-
-def _coerce_last_free_slots(raw: Any) -> LastFreeSlotsContext | None:
-    if isinstance(raw, LastFreeSlotsContext):
-        return raw
-    if isinstance(raw, dict):
-        request_raw = raw.get("request") or {}
-        try:
-            duration = int(request_raw.get("duration"))
-        except (TypeError, ValueError):
-            return None
-        request = LastFreeSlotsRequest(
-            duration=duration,
-            date_from=request_raw.get("date_from") or "",
-            date_to=request_raw.get("date_to") or "",
-            preferred_window=request_raw.get("preferred_window"),
-            preferred_start=_safe_int(request_raw.get("preferred_start")),
-            preferred_end=_safe_int(request_raw.get("preferred_end")),
-            next_start=request_raw.get("next_start"),
-            cursor_history=list(request_raw.get("cursor_history") or []),
-        )
-        slots = list(raw.get("slots") or [])
-        awaiting = bool(raw.get("awaiting_use"))
-        return LastFreeSlotsContext(slots=slots, request=request, awaiting_use=awaiting)
-    return None
+    return _coerce(context.user_data.get(ContextKey.LAST_FREE_SLOTS), LastFreeSlotsContext)
 
 
 def _safe_int(value: Any) -> int | None:
@@ -337,23 +402,13 @@ def _safe_int(value: Any) -> int | None:
 
 
 def should_reset_context(lower_text: str) -> bool:
-    normalized = lower_text.strip()
-    if normalized in RESET_KEYWORDS:
+    if lower_text.strip() in _RESET_EXACT:
         return True
-    for phrase in RESET_KEYWORDS:
-        if " " in phrase and phrase in lower_text:
-            return True
-        if (
-            lower_text.startswith(f"{phrase} ")
-            or lower_text.endswith(f" {phrase}")
-            or f" {phrase} " in lower_text
-        ):
-            return True
-    return False
+    return _RESET_PATTERN.search(lower_text) is not None
 
 
 def set_last_event_query(context: ContextTypes.DEFAULT_TYPE, query: str | None) -> None:
-    key = ContextKey.LAST_EVENT_QUERY.value
+    key = ContextKey.LAST_EVENT_QUERY
     if query:
         context.user_data[key] = query
     else:
@@ -361,18 +416,18 @@ def set_last_event_query(context: ContextTypes.DEFAULT_TYPE, query: str | None)
 
 
 def get_last_event_query(context: ContextTypes.DEFAULT_TYPE) -> str:
-    return context.user_data.get(ContextKey.LAST_EVENT_QUERY.value, "")
+    return context.user_data.get(ContextKey.LAST_EVENT_QUERY, "")
 
 
 def pop_last_event_query(context: ContextTypes.DEFAULT_TYPE) -> str:
-    return context.user_data.pop(ContextKey.LAST_EVENT_QUERY.value, "")
+    return context.user_data.pop(ContextKey.LAST_EVENT_QUERY, "")
 
 
 def set_pending_delete(
     context: ContextTypes.DEFAULT_TYPE,
     delete_context: PendingDeleteContext | None,
 ) -> None:
-    key = ContextKey.PENDING_DELETE.value
+    key = ContextKey.PENDING_DELETE
     if delete_context is None:
         context.user_data.pop(key, None)
     else:
@@ -380,37 +435,18 @@ def set_pending_delete(
 
 
 def get_pending_delete(context: ContextTypes.DEFAULT_TYPE) -> PendingDeleteContext | None:
-    raw = context.user_data.get(ContextKey.PENDING_DELETE.value)
-    if isinstance(raw, PendingDeleteContext):
-        return raw
-    if isinstance(raw, dict):
-        return PendingDeleteContext(
-            event_id=raw.get("event_id", ""),
-            summary=raw.get("summary", "(без назви)"),
-            start=raw.get("start", ""),
-        )
-    return None
+    return _coerce(context.user_data.get(ContextKey.PENDING_DELETE), PendingDeleteContext)
 
 
 def pop_pending_delete(context: ContextTypes.DEFAULT_TYPE) -> PendingDeleteContext | None:
-    key = ContextKey.PENDING_DELETE.value
-    raw = context.user_data.pop(key, None)
-    if isinstance(raw, PendingDeleteContext):
-        return raw
-    if isinstance(raw, dict):
-        return PendingDeleteContext(
-            event_id=raw.get("event_id", ""),
-            summary=raw.get("summary", "(без назви)"),
-            start=raw.get("start", ""),
-        )
-    return None
+    return _coerce(context.user_data.pop(ContextKey.PENDING_DELETE, None), PendingDeleteContext)
 
 
 def set_pending_delete_list(
     context: ContextTypes.DEFAULT_TYPE,
     items: list[PendingDeleteItem] | None,
 ) -> None:
-    key = ContextKey.PENDING_DELETE_LIST.value
+    key = ContextKey.PENDING_DELETE_LIST
     if items is None:
         context.user_data.pop(key, None)
     else:
@@ -418,49 +454,18 @@ def set_pending_delete_list(
 
 
 def get_pending_delete_list(context: ContextTypes.DEFAULT_TYPE) -> list[PendingDeleteItem]:
-    raw = context.user_data.get(ContextKey.PENDING_DELETE_LIST.value, [])
-    if isinstance(raw, list) and raw:
-        result: list[PendingDeleteItem] = []
-        for item in raw:
-            if isinstance(item, PendingDeleteItem):
-                result.append(item)
-            elif isinstance(item, dict):
-                result.append(
-                    PendingDeleteItem(
-                        event_id=item.get("event_id", ""),
-                        summary=item.get("summary", "(без назви)"),
-                        start=item.get("start", ""),
-                    )
-                )
-        return result
-    return []
+    return _coerce_list(context.user_data.get(ContextKey.PENDING_DELETE_LIST), PendingDeleteItem)
 
 
 def pop_pending_delete_list(context: ContextTypes.DEFAULT_TYPE) -> list[PendingDeleteItem]:
-    key = ContextKey.PENDING_DELETE_LIST.value
-    raw = context.user_data.pop(key, None)
-    if isinstance(raw, list) and raw:
-        result: list[PendingDeleteItem] = []
-        for item in raw:
-            if isinstance(item, PendingDeleteItem):
-                result.append(item)
-            elif isinstance(item, dict):
-                result.append(
-                    PendingDeleteItem(
-                        event_id=item.get("event_id", ""),
-                        summary=item.get("summary", "(без назви)"),
-                        start=item.get("start", ""),
-                    )
-                )
-        return result
-    return []
+    return _coerce_list(context.user_data.pop(ContextKey.PENDING_DELETE_LIST, None), PendingDeleteItem)
 
 
 def set_pending_update_list(
     context: ContextTypes.DEFAULT_TYPE,
     list_context: PendingUpdateListContext | None,
 ) -> None:
-    key = ContextKey.PENDING_UPDATE_LIST.value
+    key = ContextKey.PENDING_UPDATE_LIST
     if list_context is None:
         context.user_data.pop(key, None)
     else:
@@ -468,8 +473,8 @@ def set_pending_update_list(
 
 
 def get_pending_update_list(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdateListContext | None:
-    raw_list = context.user_data.get(ContextKey.PENDING_UPDATE_LIST.value)
-    raw_data = context.user_data.get(ContextKey.PENDING_UPDATE_DATA.value)
+    raw_list = context.user_data.get(ContextKey.PENDING_UPDATE_LIST)
+    raw_data = context.user_data.get(ContextKey.PENDING_UPDATE_DATA)
     
     if raw_list is None:
         return None
@@ -483,14 +488,7 @@ def get_pending_update_list(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdate
             if isinstance(item, PendingDeleteItem):  # type: ignore
                 continue
             elif isinstance(item, dict):
-                items.append(
-                    PendingUpdateListItem(
-                        event_id=item.get("event_id", ""),
-                        summary=item.get("summary", "(без назви)"),
-                        start=item.get("start", ""),
-                        event_data=item.get("event_data") or {},
-                    )
-                )
+                items.append(PendingUpdateListItem.from_dict(item))
     
     update_data = EventUpdatePayload.from_dict(raw_data) if raw_data else EventUpdatePayload(patch={})
     
@@ -501,8 +499,8 @@ def get_pending_update_list(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdate
 
 def pop_pending_update_list(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdateListContext | None:
     result = get_pending_update_list(context)
-    context.user_data.pop(ContextKey.PENDING_UPDATE_LIST.value, None)
-    context.user_data.pop(ContextKey.PENDING_UPDATE_DATA.value, None)
+    context.user_data.pop(ContextKey.PENDING_UPDATE_LIST, None)
+    context.user_data.pop(ContextKey.PENDING_UPDATE_DATA, None)
     return result
 
 
@@ -510,7 +508,7 @@ def set_pending_update_detail(
     context: ContextTypes.DEFAULT_TYPE,
     detail: PendingUpdateDetail | None,
 ) -> None:
-    key = ContextKey.PENDING_UPDATE_DETAIL.value
+    key = ContextKey.PENDING_UPDATE_DETAIL
     if detail is None:
         context.user_data.pop(key, None)
     else:
@@ -518,20 +516,8 @@ def set_pending_update_detail(
 
 
 def get_pending_update_detail(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdateDetail | None:
-    raw = context.user_data.get(ContextKey.PENDING_UPDATE_DETAIL.value)
-    if isinstance(raw, PendingUpdateDetail):
-        return raw
-    if isinstance(raw, dict):
-        return PendingUpdateDetail(keywords=raw.get("keywords", ""))
-    return None
+    return _coerce(context.user_data.get(ContextKey.PENDING_UPDATE_DETAIL), PendingUpdateDetail)
 
 
 def pop_pending_update_detail(context: ContextTypes.DEFAULT_TYPE) -> PendingUpdateDetail | None:
-    key = ContextKey.PENDING_UPDATE_DETAIL.value
-    raw = context.user_data.pop(key, None)
-    if isinstance(raw, PendingUpdateDetail):
-        return raw
-    if isinstance(raw, dict):
-        return PendingUpdateDetail(keywords=raw.get("keywords", ""))
-    return None
-
+    return _coerce(context.user_data.pop(ContextKey.PENDING_UPDATE_DETAIL, None), PendingUpdateDetail)
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 from zoneinfo import ZoneInfo
 
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 from app.bot.context import (
-    FREE_SLOT_EXPECTATION_KEY,
     AgendaContext,
     PendingCreateConflict,
     PendingDeleteContext,
@@ -21,6 +23,7 @@ from app.bot.context import (
     PendingUpdateListItem,
     PendingUpdateListContext,
     ServiceContainer,
+    clear_free_slot_expectation,
     get_agenda_context,
     get_last_event_context,
     get_last_event_query,
@@ -46,19 +49,19 @@ from app.schemas.calendar import CalendarEvent, EventDraft, EventUpdatePayload,
 from app.bot.free_slots import (
     build_window_range as _build_window_range,
     pick_slot_from_context as _pick_slot_from_context,
-    _detect_range_from_text,
-    _detect_window_from_text,
-    _extract_custom_time_range,
     _extract_date_range,
     _parse_iso_datetime,
+    _range_from_tags,
     _resolve_preferred_hours,
+    _scan_text,
+    _window_from_tags,
 )
 from app.config.settings import Settings
 from app.services.gemini import EventProposal, GeminiAnalysisResult
 
 logger = logging.getLogger(__name__)
 
-CATEGORY_COLOR_MAP = {
+CATEGORY_COLOR_MAP: Mapping[str, str] = MappingProxyType({
     "work": "6",  # тangerine
     "meeting": "2",  # sage
     "study": "9",  # blueberry
@@ -69,21 +72,201 @@ CATEGORY_COLOR_MAP = {
     "travel": "4",  # flamingo
     "focus": "1",  # lavender
     "other": "3",  # grape
-}
+})
+
+CATEGORY_KEYWORDS: Mapping[str, tuple[str, ...]] = MappingProxyType({
+    "work": ("робоч", "проєкт", "проекта", "project", "meeting з клієнтом", "звіт"),
+    "meeting": ("зустріч", "call", "колл", "колег", "співбесід", "meeting"),
+    "study": ("лекці", "пара", "семінар", "курс", "заняття", "вебінар", "стаді", "лаба"),
+    "sport": ("спорт", "спортзал", "йога", "фітнес", "біг", "тренув", "зарядка"),
+    "health": ("лікар", "стоматолог", "психолог", "мед", "вітаміни"),
+    "personal": ("родин", "друзі", "сім'я", "кава", "зустріч з друзями"),
+    "hobby": ("читан", "малюван", "музик", "грати", "хобі"),
+    "travel": ("подорож", "квиток", "поїздка", "аеропорт", "виліт"),
+    "focus": ("фокус", "deep work", "концентрація", "планування"),
+})
+
+# Іменована група на кожну категорію; "study_fallback" — старий запасний збіг "лекц", що має
+# найнижчий пріоритет. Інші запасні слова ("зустріч", "call", "спорт", ...) вже є серед ключових.
+_CATEGORY_GROUPS: tuple[tuple[str, str, tuple[str, ...]], ...] = (
+    *((category, category, keywords) for category, keywords in CATEGORY_KEYWORDS.items()),
+    ("study_fallback", "study", ("лекц",)),
+)
+# Кожна позиція тексту перевіряється lookahead-ом, тому знаходимо всі категорії за один прохід;
+# пріоритет (порядок _CATEGORY_GROUPS) застосовується вже після пошуку.
+_CATEGORY_PATTERN = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<{group}>{'|'.join(re.escape(keyword.lower()) for keyword in keywords)})"
+        for group, _, keywords in _CATEGORY_GROUPS
+    )
+    + ")"
+)
 
-CATEGORY_KEYWORDS = {
-    "work": ["робоч", "проєкт", "проекта", "project", "meeting з клієнтом", "звіт"],
-    "meeting": ["зустріч", "call", "колл", "колег", "співбесід", "meeting"],
-    "study": ["лекці", "пара", "семінар", "курс", "заняття", "вебінар", "стаді", "лаба"],
-    "sport": ["спорт", "спортзал", "йога", "фітнес", "біг", "тренув", "зарядка"],
-    "health": ["лікар", "стоматолог", "психолог", "мед", "вітаміни"],
-    "personal": ["родин", "друзі", "сім'я", "кава", "зустріч з друзями"],
-    "hobby": ["читан", "малюван", "музик", "грати", "хобі"],
-    "travel": ["подорож", "квиток", "поїздка", "аеропорт", "виліт"],
-    "focus": ["фокус", "deep work", "концентрація", "планування"],
-}
+# Один спільний \b і лише незахоплювальні групи: для перевірки збігу довші варіанти
+# ("цю подію" після "цю") зайві, тож движку менше відкатів на кожне повідомлення
+_LAST_EVENT_MARKERS_PATTERN = re.compile(
+    r"\b(?:"
+    r"про\s+(?:неї|це|цю|її)"
+    r"|до\s+(?:неї|цієї)"
+    r"|в\s+(?:неї|цю)"
+    r"|на\s+(?:неї|це|цю)"
+    r"|туди\s"
+    r"|її\b"
+    r"|цієї\s+події\b"
+    r"|цю\s+подію\b"
+    r"|за\s+неї\b"
+    r")"
+)
+_MEET_KEYWORDS = (
+    "додай міт",
+    "додай meet",
+    "зроби meet",
+    "міт треба",
+    "meet треба",
+    "google meet",
+    "гугл міт",
+    "міт",
+    "meet",
+    "онлайн зустріч",
+    "онлайн-зустріч",
+    "дзвінок",
+    "дзвонок",
+    "зум",
+    "zoom",
+    "відеодзвінок",
+    "потрібен лінк",
+    "потрібне посилання",
+    "посилання на зустріч",
+)
+_REMOVE_MEET_KEYWORDS = (
+    "без meet",
+    "без міт",
+    "прибери meet",
+    "прибери міт",
+    "видали meet",
+    "видали міт",
+    "скасуй meet",
+    "скасуй міт",
+    "відключи meet",
+    "без посилання",
+)
+_REMINDER_REMOVAL_KEYWORDS = (
+    "без нагад",
+    "прибери нагад",
+    "видали нагад",
+    "скасуй нагад",
+    "нагадування не треба",
+    "нагадування не потрібно",
+)
+
+
+def _literal_alternation(keywords: tuple[str, ...]) -> str:
+    return "|".join(re.escape(keyword) for keyword in keywords)
+
+
+_MEET_PATTERN = re.compile(_literal_alternation(_MEET_KEYWORDS))
+_REMOVE_MEET_PATTERN = re.compile(_literal_alternation(_REMOVE_MEET_KEYWORDS))
+_REMINDER_REMOVAL_PATTERN = re.compile(_literal_alternation(_REMINDER_REMOVAL_KEYWORDS))
+# Усі три набори ключових слів за один прохід тексту (lookahead перевіряє кожну позицію)
+_KEYWORD_FLAGS_PATTERN = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<{flag}>{_literal_alternation(keywords)})"
+        for flag, keywords in (
+            ("add_meet", _MEET_KEYWORDS),
+            ("remove_meet", _REMOVE_MEET_KEYWORDS),
+            ("reminder_off", _REMINDER_REMOVAL_KEYWORDS),
+        )
+    )
+    + ")"
+)
+_REMINDER_PATTERN = re.compile(r"нагад\w*.*?(?:за|перед)\s*(\d+)\s*(хв|хвилин|год|години)")
+_REMINDER_SHORT_PATTERN = re.compile(r"за\s+(\d+)\s*(хв|хвилин|год|години)\s+до")
+_DURATION_PATTERN = re.compile(r"(\d+)\s*(хв|хвилин|год|години)")
+# Чотири форми часу в порядку пріоритету; lookahead дає всі входження за один прохід
+_ABSOLUTE_TIME_PATTERN = re.compile(
+    r"(?="
+    r"(?P<on_hm>на\s+(?P<on_hm_hour>\d{1,2}):(?P<on_hm_minute>\d{2}))"
+    r"|(?P<at_hm>о\s+(?P<at_hm_hour>\d{1,2})[:.](?P<at_hm_minute>\d{2}))"
+    r"|(?P<on_h>на\s+(?P<on_h_hour>\d{1,2}))"
+    r"|(?P<at_h>о\s+(?P<at_h_hour>\d{1,2}))"
+    r")"
+)
+_ABSOLUTE_TIME_PRIORITY = ("on_hm", "at_hm", "on_h", "at_h")
+_TIME_SHIFT_PATTERN = re.compile(
+    r"на\s+(?:([\d]+|[а-яіїєґ'’`]+)\s*)?(год|годин|години|годину|хв|хвилин|хвилини|хвилину)\s*"
+    r"(пізніше|пізнише|пізн|позд|раніше|ранише|скоріше|скорше)"
+)
+_TIME_SHIFT_DIRECTION_PATTERN = re.compile(r"пізн|позд|рані|рани|скор")
+_NUMBER_WORDS: Mapping[str, float] = MappingProxyType(
+    {
+        "одна": 1,
+        "одну": 1,
+        "один": 1,
+        "пів": 0.5,
+        "півгодини": 0.5,
+        "півгодину": 0.5,
+        "півтори": 1.5,
+        "дві": 2,
+        "двіє": 2,
+        "двох": 2,
+        "два": 2,
+        "три": 3,
+        "чотири": 4,
+        "чотирьох": 4,
+    }
+)
+_QUOTES_PATTERN = re.compile(r"[\"'«»“”]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# Відкидаємо одну голосну/м'який знак у кінці, щоб пошук знаходив інші відмінки
+_KEYWORD_SUFFIX_PATTERN = re.compile(r"[аяуюіїеоиь]\Z", re.IGNORECASE)
+
+_CANCEL_DELETE_ROW = (InlineKeyboardButton("❌ Скасувати", callback_data="cancel_delete"),)
+_CANCEL_UPDATE_ROW = (InlineKeyboardButton("❌ Скасувати", callback_data="cancel_update"),)
+_CONFIRM_DELETE_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("✅ Так, видалити", callback_data="confirm_delete")],
+        _CANCEL_DELETE_ROW,
+    ]
+)
+
+_CONFLICT_CANCEL_ROW = (InlineKeyboardButton("❌ Скасувати", callback_data="conflict_cancel"),)
+_CONFLICT_CREATE_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("✅ Так, створити", callback_data="conflict_confirm")],
+        _CONFLICT_CANCEL_ROW,
+    ]
+)
+_CONFLICT_UPDATE_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("✅ Так, оновити", callback_data="conflict_confirm")],
+        _CONFLICT_CANCEL_ROW,
+    ]
+)
 
 DEFAULT_REMINDER_MINUTES = 10
+# Скільки подій показуємо кнопками при видаленні/редагуванні
+MAX_EVENT_CHOICES = 5
+_DEFAULT_START_TIME = time(9, 0)
+_KYIV_TZ = ZoneInfo("Europe/Kyiv")
+# Тип повторення -> (RRULE, підпис у відповіді)
+_RECURRENCE_RULES: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        "daily": ("RRULE:FREQ=DAILY;COUNT=30", "щодня"),
+        "weekly": ("RRULE:FREQ=WEEKLY;COUNT=12", "щотижня"),
+        "monthly": ("RRULE:FREQ=MONTHLY;COUNT=6", "щомісяця"),
+    }
+)
+_RECURRENCE_LABELS: Mapping[str, str] = MappingProxyType(
+    {rule: label for rule, label in _RECURRENCE_RULES.values()}
+)
+# Конфігурації нагадувань ніде не змінюються після створення, тож типові значення спільні
+_cached_reminders_from_minutes = lru_cache(maxsize=32)(RemindersConfig.from_minutes)
+_EVENT_LINE_TEMPLATE = "• {summary} — {start} → {end}{link}"
+_EVENT_SEPARATOR = "────────────────────"
+_inflight_searches: dict[tuple[int, str, int], asyncio.Future[tuple[list[CalendarEvent], str]]] = {}
+_NON_PATCH_KEYS = frozenset({"add_meet", "remove_meet", "color_id", "reminder_minutes"})
 
 
 class UpdateConflictDetected(Exception):
@@ -116,23 +299,9 @@ async def handle_create_event(
         )
         return
 
-    start_payload = {
-        "dateTime": start_dt.isoformat(),
-        "timeZone": services.settings.timezone,
-    }
-    end_payload = {
-        "dateTime": end_dt.isoformat(),
-        "timeZone": services.settings.timezone,
-    }
-
-    recurrence_rules = None
-    if event.recurrence:
-        recurrence_rules = _build_recurrence_rule(event.recurrence)
-
-    attach_meet = _should_attach_meet(event, original_text)
-    color_id = _resolve_color_id(event, original_text)
-    conference_data = services.calendar.build_conference_data() if attach_meet else None
-    reminders_payload = _build_reminders_payload(event, original_text)
+    timezone = services.settings.timezone
+    start_payload = _datetime_payload(start_dt, timezone)
+    end_payload = _datetime_payload(end_dt, timezone)
 
     reply_text = analysis.reply
     if slot_from_context:
@@ -146,16 +315,16 @@ async def handle_create_event(
             end=end_payload,
             description=event.notes,
             location=event.location,
-            recurrence=recurrence_rules,
-            conference_data=conference_data,
-            color_id=color_id,
-            reminders=reminders_payload,
         )
     except ValueError as exc:
         logger.warning("Некоректні дані події для %s: %s", telegram_id, exc)
         await message.reply_text("Не вдалося розібрати дату чи час. Перевір, будь ласка, запит.")
         return
 
+    # Текст запиту приводимо до нижнього регістру один раз для всіх евристик
+    lower_text = (original_text or "").lower()
+
+    # Решту полів події добудовуємо лише тоді, коли її справді створюватимемо
     conflict = await _detect_conflict(services, telegram_id, start_dt, end_dt)
     if conflict:
         set_pending_create_conflict(
@@ -164,21 +333,19 @@ async def handle_create_event(
                 draft=event_draft,
                 conflict=conflict,
                 reply_text=reply_text,
+                proposal=event,
+                lower_text=lower_text,
             ),
         )
         await message.reply_text(
             "⚠️ У цей час вже є подія:\n"
             f"• {conflict['summary']} — {conflict['time']}\n"
             "Створити все одно?",
-            reply_markup=InlineKeyboardMarkup(
-                [
-                    [InlineKeyboardButton("✅ Так, створити", callback_data="conflict_confirm")],
-                    [InlineKeyboardButton("❌ Скасувати", callback_data="conflict_cancel")],
-                ]
-            ),
+            reply_markup=_CONFLICT_CREATE_KEYBOARD,
         )
         return
 
+    _complete_event_draft(services, event_draft, event, lower_text)
     await _create_event_with_payload(
         services,
         telegram_id,
@@ -199,16 +366,17 @@ async def handle_agenda(
     message = update.effective_message
     telegram_id = update.effective_user.id
 
-    tz = ZoneInfo(services.settings.timezone)
+    tz = services.settings.tzinfo
     now = datetime.now(tz)
     agenda_info = analysis.metadata.get("agenda") or {}
     last_agenda = get_agenda_context(context)
 
     date_value = agenda_info.get("date") or (last_agenda.date if last_agenda else None)
     date_dt = _parse_iso_datetime(date_value, tz) if date_value else None
+    text_tags = _scan_text(original_text.lower())
 
     if not date_dt:
-        start_guess, _ = _detect_range_from_text(original_text, now)
+        start_guess, _ = _range_from_tags(text_tags, now)
         date_dt = start_guess or (last_agenda.date_dt if last_agenda else None)
 
     if not date_dt:
@@ -217,13 +385,18 @@ async def handle_agenda(
 
     window = (
         agenda_info.get("time_window")
-        or _detect_window_from_text(original_text)
+        or _window_from_tags(text_tags)
         or last_agenda.get("time_window")
         or "full"
     )
     start_dt, end_dt, label = _build_window_range(date_dt, window)
 
-    events = await services.calendar.list_events_between(telegram_id, start_dt, end_dt)
+    events = await services.calendar.agenda_cache.get_or_fetch(
+        telegram_id,
+        start_dt,
+        end_dt,
+        lambda: services.calendar.list_events_between(telegram_id, start_dt, end_dt),
+    )
     reply = format_events_list(events, start_dt, end_dt, label=label)
     await message.reply_text(reply)
 
@@ -250,7 +423,7 @@ async def handle_agenda_button(
     message = update.effective_message
     telegram_id = update.effective_user.id
 
-    tz = ZoneInfo(services.settings.timezone)
+    tz = services.settings.tzinfo
     now = datetime.now(tz)
 
     if day == "today":
@@ -259,7 +432,12 @@ async def handle_agenda_button(
         date_dt = now + timedelta(days=1)
 
     start_dt, end_dt, label = _build_window_range(date_dt, "full")
-    events = await services.calendar.list_events_between(telegram_id, start_dt, end_dt)
+    events = await services.calendar.agenda_cache.get_or_fetch(
+        telegram_id,
+        start_dt,
+        end_dt,
+        lambda: services.calendar.list_events_between(telegram_id, start_dt, end_dt),
+    )
     reply = format_events_list(events, start_dt, end_dt, label=label)
     await message.reply_text(reply)
 
@@ -301,15 +479,7 @@ async def handle_event_lookup_direct(
 
     lines = ["Знайдені події:"]
     for event in events:
-        start_str = format_iso_datetime(event.start)
-        end_str = format_iso_datetime(event.end)
-        summary = event.summary
-        link = event.html_link
-        if link:
-            lines.append(f"• {summary} — {start_str} → {end_str} ({link})")
-        else:
-            lines.append(f"• {summary} — {start_str} → {end_str}")
-        _append_event_details(lines, event)
+        _append_event_row(lines, event)
     await message.reply_text("\n".join(lines))
 
     first_event = events[0]
@@ -345,15 +515,7 @@ async def handle_event_lookup(
 
     lines = ["Знайдені події:"]
     for event in events:
-        start_str = format_iso_datetime(event.start)
-        end_str = format_iso_datetime(event.end)
-        summary = event.summary
-        link = event.html_link
-        if link:
-            lines.append(f"• {summary} — {start_str} → {end_str} ({link})")
-        else:
-            lines.append(f"• {summary} — {start_str} → {end_str}")
-        _append_event_details(lines, event)
+        _append_event_row(lines, event)
     await message.reply_text("\n".join(lines))
 
     first_event = events[0]
@@ -382,7 +544,7 @@ async def handle_event_delete(
         services,
         telegram_id,
         keywords,
-        max_results=10,
+        max_results=MAX_EVENT_CHOICES,
     )
 
     if not events:
@@ -406,23 +568,18 @@ async def handle_event_delete(
             ),
         )
 
-        buttons = [
-            [InlineKeyboardButton("✅ Так, видалити", callback_data="confirm_delete")],
-            [InlineKeyboardButton("❌ Скасувати", callback_data="cancel_delete")],
-        ]
-
         await message.reply_text(
             f"Видалити подію?\n\n📅 {summary}\n🕒 {start_str}",
-            reply_markup=InlineKeyboardMarkup(buttons),
+            reply_markup=_CONFIRM_DELETE_KEYBOARD,
         )
     else:
         delete_items = [
             PendingDeleteItem(
-                event_id=e.get("id", ""),
-                summary=e.get("summary", "(без назви)"),
-                start=format_iso_datetime(e.get("start", {})),
+                event_id=e.id,
+                summary=e.summary or "(без назви)",
+                start=format_iso_datetime(e.start),
             )
-            for e in events[:5]
+            for e in events
         ]
         set_pending_delete_list(context, delete_items)
 
@@ -435,7 +592,7 @@ async def handle_event_delete(
             ]
             for i, item in enumerate(delete_items)
         ]
-        buttons.append([InlineKeyboardButton("❌ Скасувати", callback_data="cancel_delete")])
+        buttons.append(_CANCEL_DELETE_ROW)
 
         await message.reply_text(
             f"Знайдено {len(events)} подій із назвою \"{keywords}\".\nОбери, яку видалити:",
@@ -461,7 +618,7 @@ async def handle_event_update_by_id(
         await message.reply_text("Не вдалося знайти цю подію. Можливо, вона була видалена.")
         return
 
-    original_start_dt = _parse_google_datetime(event.start, ZoneInfo(services.settings.timezone))
+    original_start_dt = _parse_google_datetime(event.start, services.settings.tzinfo)
     if original_start_dt and original_text:
         additional_updates = infer_update_data_from_text(original_text, original_start_dt)
         if additional_updates:
@@ -470,11 +627,12 @@ async def handle_event_update_by_id(
                     update_data.setdefault(key, value)
             elif isinstance(update_data, EventUpdatePayload):
                 for key, value in additional_updates.items():
-                    if key not in ("add_meet", "remove_meet", "color_id", "reminder_minutes"):
+                    if key not in _NON_PATCH_KEYS:
                         update_data.patch.setdefault(key, value)
 
     plan = EventUpdatePayload.from_dict(update_data)
-    sanitized_update = {k: v for k, v in plan.patch.items() if v not in (None, "", [])}
+    # from_dict для словника вже створює новий patch; готовий payload з контексту не чіпаємо
+    sanitized_update = _drop_empty_values(plan.patch if plan is not update_data else dict(plan.patch))
     add_meet_requested = plan.add_meet or bool(sanitized_update.pop("add_meet", False))
     remove_meet_requested = plan.remove_meet or bool(sanitized_update.pop("remove_meet", False))
     if add_meet_requested and remove_meet_requested:
@@ -499,44 +657,23 @@ async def handle_event_update_by_id(
             color_id=color_id,
             reminders=reminders_update,
             clear_reminders=reminder_minutes == 0,
+            original_is_current=True,
         )
 
-        summary = updated_event.summary or "(без назви)"
-        start_str = format_iso_datetime(updated_event.start)
-        link = updated_event.html_link or ""
-
-        reply_lines = [
-            "✅ Подію оновлено:",
-            f"📅 {summary}",
-            f"🕒 {start_str}",
-        ]
-        reminder_label = event_reminder_label(updated_event)
-        if reminder_label:
-            reply_lines.append(reminder_label)
-        if link:
-            reply_lines.append(link)
-        meet_link = updated_event.hangout_link
-        if meet_link:
-            reply_lines.append(f"🔗 Google Meet: {meet_link}")
-
-        await message.reply_text("\n".join(reply_lines))
-        context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
-
-        set_last_event_context(context, event_id, summary)
-        set_last_event_query(context, summary)
+        await _send_update_success_reply(message, context, updated_event, event_id)
     except UpdateConflictDetected as conflict_exc:
         set_pending_update_conflict(
             context,
             PendingUpdateConflict(
                 event_id=event_id,
                 update=EventUpdatePayload(
-                    patch=sanitized_update.copy(),
+                    patch=sanitized_update,
                     add_meet=add_meet_requested,
                     remove_meet=remove_meet_requested,
                     color_id=color_id,
                     reminder_minutes=reminder_minutes,
                 ),
-                original_event=event.as_dict(),
+                original_event=event,
                 conflict=conflict_exc.conflict,
             ),
         )
@@ -544,12 +681,7 @@ async def handle_event_update_by_id(
             "⚠️ У цей час вже є подія:\n"
             f"• {conflict_exc.conflict['summary']} — {conflict_exc.conflict['time']}\n"
             "Оновити все одно?",
-            reply_markup=InlineKeyboardMarkup(
-                [
-                    [InlineKeyboardButton("✅ Так, оновити", callback_data="conflict_confirm")],
-                    [InlineKeyboardButton("❌ Скасувати", callback_data="conflict_cancel")],
-                ]
-            ),
+            reply_markup=_CONFLICT_UPDATE_KEYBOARD,
         )
     except Exception as exc:
         logger.exception("Помилка при оновленні події: %s", exc)
@@ -575,23 +707,25 @@ async def maybe_handle_reminder_command(
     query_info = metadata.get("event_query") or {}
     keywords = (query_info.get("keywords") or "").strip()
     last_event = get_last_event_context(context)
-    last_query = get_last_event_query(context).strip().lower()
-    mentions_last_query = bool(last_query and last_query in lower_text)
-    last_summary = (
-        (last_event.summary or "").lower() if last_event else ""
-    )
-    mentions_last_summary = bool(last_summary and last_summary in lower_text)
 
-    if analysis.event and not (keywords or mentions_last_query or mentions_last_summary):
-        return False
-    reminder_minutes = _parse_reminder_from_text(original_text)
+    # Збіги з останнім запитом/подією потрібні лише тоді, коли Gemini побачив нову подію
+    if analysis.event and not keywords:
+        last_query = get_last_event_query(context).strip().lower()
+        last_summary = (last_event.summary or "").lower() if last_event else ""
+        if not (
+            (last_query and last_query in lower_text)
+            or (last_summary and last_summary in lower_text)
+        ):
+            return False
+    flags = _keyword_flags(lower_text)
+    reminder_minutes = 0 if "reminder_off" in flags else _reminder_offset_from_lower(lower_text)
     if reminder_minutes is None:
         return False
 
     update_payload = {"reminder_minutes": reminder_minutes}
-    if text_requests_meet(original_text):
+    if "add_meet" in flags:
         update_payload["add_meet"] = True
-    if text_requests_remove_meet(original_text):
+    if "remove_meet" in flags:
         update_payload["remove_meet"] = True
 
     if keywords:
@@ -666,7 +800,7 @@ async def handle_event_update(
         services,
         telegram_id,
         keywords,
-        max_results=10,
+        max_results=MAX_EVENT_CHOICES,
     )
 
     if not events:
@@ -675,19 +809,14 @@ async def handle_event_update(
 
     set_last_event_query(context, used_query or keywords)
 
-    first_event = events[0]
-    original_start_dt = None
-    if isinstance(first_event, CalendarEvent):
-        original_start_dt = _parse_google_datetime(first_event.start, ZoneInfo(services.settings.timezone))
-    elif isinstance(first_event, dict):
-        original_start_dt = _parse_google_datetime(first_event.get("start", {}), ZoneInfo(services.settings.timezone))
+    original_start_dt = _parse_google_datetime(events[0].start, services.settings.tzinfo)
 
     update_data = dict(metadata.get("event_update") or {})
     inferred = infer_update_data_from_text(original_text, original_start_dt)
     for key, value in inferred.items():
         update_data.setdefault(key, value)
 
-    sanitized_update = {k: v for k, v in update_data.items() if v not in (None, "", [])}
+    sanitized_update = _drop_empty_values(update_data)
     add_meet_requested = bool(sanitized_update.pop("add_meet", False))
     remove_meet_requested = bool(sanitized_update.pop("remove_meet", False))
     if add_meet_requested and remove_meet_requested:
@@ -697,7 +826,7 @@ async def handle_event_update(
     reminder_minutes = _safe_int_value(sanitized_update.pop("reminder_minutes", None))
 
     update_plan = EventUpdatePayload(
-        patch=sanitized_update.copy(),
+        patch=sanitized_update,
         add_meet=add_meet_requested,
         remove_meet=remove_meet_requested,
         color_id=color_id,
@@ -715,7 +844,7 @@ async def handle_event_update(
 
     if len(events) == 1:
         event = events[0]
-        event_id = event.id if isinstance(event, CalendarEvent) else event.get("id")
+        event_id = event.id
 
         reminders_update = _build_reminders_from_minutes(update_plan.reminder_minutes)
         try:
@@ -724,44 +853,23 @@ async def handle_event_update(
                 telegram_id,
                 event_id,
                 event,
-                update_plan.patch.copy(),
+                update_plan.patch,
                 add_meet=update_plan.add_meet,
                 remove_meet=update_plan.remove_meet,
                 color_id=update_plan.color_id,
                 reminders=reminders_update,
                 clear_reminders=update_plan.reminder_minutes == 0,
+                original_is_current=True,
             )
 
-            summary = updated_event.summary or "(без назви)"
-            start_str = format_iso_datetime(updated_event.start)
-            link = updated_event.html_link or ""
-
-            reply_lines = [
-                "✅ Подію оновлено:",
-                f"📅 {summary}",
-                f"🕒 {start_str}",
-            ]
-            reminder_label = event_reminder_label(updated_event)
-            if reminder_label:
-                reply_lines.append(reminder_label)
-            if link:
-                reply_lines.append(link)
-            meet_link = updated_event.hangout_link
-            if meet_link:
-                reply_lines.append(f"🔗 Google Meet: {meet_link}")
-
-            await message.reply_text("\n".join(reply_lines))
-            context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
-
-            set_last_event_context(context, event_id, summary)
-            set_last_event_query(context, summary)
+            await _send_update_success_reply(message, context, updated_event, event_id)
         except UpdateConflictDetected as conflict_exc:
             set_pending_update_conflict(
                 context,
                 PendingUpdateConflict(
                     event_id=event_id,
                     update=update_plan,
-                    original_event=event.as_dict(),
+                    original_event=event,
                     conflict=conflict_exc.conflict,
                 ),
             )
@@ -769,38 +877,22 @@ async def handle_event_update(
                 "⚠️ У цей час вже є подія:\n"
                 f"• {conflict_exc.conflict['summary']} — {conflict_exc.conflict['time']}\n"
                 "Оновити все одно?",
-                reply_markup=InlineKeyboardMarkup(
-                    [
-                        [InlineKeyboardButton("✅ Так, оновити", callback_data="conflict_confirm")],
-                        [InlineKeyboardButton("❌ Скасувати", callback_data="conflict_cancel")],
-                    ]
-                ),
+                reply_markup=_CONFLICT_UPDATE_KEYBOARD,
             )
             return
         except Exception as exc:
             logger.exception("Помилка при оновленні події: %s", exc)
             await message.reply_text(f"Не вдалося оновити подію: {exc}")
     else:
-        update_items = []
-        for e in events[:5]:
-            if isinstance(e, CalendarEvent):
-                event_id = e.id
-                summary = e.summary or "(без назви)"
-                start_dict = e.start
-                event_data = e.as_dict()
-            else:
-                event_id = e.get("id", "")
-                summary = e.get("summary", "(без назви)")
-                start_dict = e.get("start", {})
-                event_data = e
-            update_items.append(
-                PendingUpdateListItem(
-                    event_id=event_id,
-                    summary=summary,
-                    start=format_iso_datetime(start_dict),
-                    event_data=event_data,
-                )
+        update_items = [
+            PendingUpdateListItem(
+                event_id=e.id,
+                summary=e.summary or "(без назви)",
+                start=format_iso_datetime(e.start),
+                event_data=e.as_dict(),
             )
+            for e in events
+        ]
         set_pending_update_list(
             context,
             PendingUpdateListContext(items=update_items, update_data=update_plan),
@@ -815,7 +907,7 @@ async def handle_event_update(
             ]
             for i, item in enumerate(update_items)
         ]
-        buttons.append([InlineKeyboardButton("❌ Скасувати", callback_data="cancel_update")])
+        buttons.append(_CANCEL_UPDATE_ROW)
 
         await message.reply_text(
             f"Знайдено {len(events)} подій із назвою \"{keywords}\".\nОбери, яку редагувати:",
@@ -823,6 +915,37 @@ async def handle_event_update(
         )
 
 
+async def _send_update_success_reply(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    updated_event: CalendarEvent,
+    event_id: str,
+) -> None:
+    summary = updated_event.summary or "(без назви)"
+    start_str = format_iso_datetime(updated_event.start)
+    link = updated_event.html_link or ""
+
+    reply_lines = [
+        "✅ Подію оновлено:",
+        f"📅 {summary}",
+        f"🕒 {start_str}",
+    ]
+    reminder_label = event_reminder_label(updated_event)
+    if reminder_label:
+        reply_lines.append(reminder_label)
+    if link:
+        reply_lines.append(link)
+    meet_link = updated_event.hangout_link
+    if meet_link:
+        reply_lines.append(f"🔗 Google Meet: {meet_link}")
+
+    await message.reply_text("\n".join(reply_lines))
+    clear_free_slot_expectation(context)
+
+    set_last_event_context(context, event_id, summary)
+    set_last_event_query(context, summary)
+
+
 async def create_event_from_pending(
     context: ContextTypes.DEFAULT_TYPE,
     services: ServiceContainer,
@@ -832,6 +955,8 @@ async def create_event_from_pending(
     if isinstance(payload, PendingCreateConflict):
         draft = payload.draft
         reply_text = payload.reply_text
+        if payload.proposal is not None:
+            _complete_event_draft(services, draft, payload.proposal, payload.lower_text)
     else:
         data = payload.get("event_payload") or {}
         try:
@@ -872,7 +997,7 @@ async def apply_update_from_pending_conflict(
         plan = EventUpdatePayload.from_dict(payload)
         event_id = payload.get("event_id")
         original_event = payload.get("original_event", {})
-    update_data = plan.patch.copy()
+    update_data = plan.patch
     reminders_payload = _build_reminders_from_minutes(plan.reminder_minutes)
 
     try:
@@ -918,23 +1043,26 @@ async def apply_update_from_pending_conflict(
 
 def infer_update_data_from_text(text: str, original_start: datetime | None = None) -> dict[str, Any]:
     result: dict[str, Any] = {}
-    absolute_time = _parse_absolute_time_from_text(text, original_start)
+    # Усі парсери нижче працюють з одним і тим самим рядком у нижньому регістрі
+    lower = text.lower()
+    absolute_time = _parse_absolute_time_from_text(lower, original_start)
     if absolute_time:
         result["start"] = absolute_time.isoformat()
     else:
-        shift = _parse_time_shift(text)
+        shift = _parse_time_shift(lower)
         if shift:
             result["shift_minutes"] = shift
     
-    duration = _parse_duration_minutes(text)
+    duration = _parse_duration_minutes(lower)
     if duration:
         result["duration_minutes"] = duration
-    reminder = _parse_reminder_from_text(text)
+    flags = _keyword_flags(lower)
+    reminder = 0 if "reminder_off" in flags else _reminder_offset_from_lower(lower)
     if reminder is not None:
         result["reminder_minutes"] = reminder
-    if text_requests_meet(text):
+    if "add_meet" in flags:
         result["add_meet"] = True
-    if text_requests_remove_meet(text):
+    if "remove_meet" in flags:
         result["remove_meet"] = True
     return result
 
@@ -942,66 +1070,23 @@ def infer_update_data_from_text(text: str, original_start: datetime | None = Non
 def text_refers_to_last_created_event(text: str) -> bool:
     if not text:
         return False
-    context_markers = [
-        r"\bпро\s+(неї|це|цю|цю\s+подію|її)",
-        r"\bдо\s+(неї|цієї|цієї\s+події)",
-        r"\bв\s+(неї|цю|цю\s+подію)",
-        r"\bна\s+(неї|це|цю|цю\s+подію)",
-        r"\bтуди\s+(ж|же)?",
-        r"\bїї\b",
-        r"\bцієї\s+події\b",
-        r"\bцю\s+подію\b",
-        r"\bза\s+неї\b",
-    ]
-    for pattern in context_markers:
-        if re.search(pattern, text):
-            return True
-    return False
+    return _LAST_EVENT_MARKERS_PATTERN.search(text) is not None
+
+
+def _keyword_flags(lower: str) -> set[str]:
+    return {match.lastgroup for match in _KEYWORD_FLAGS_PATTERN.finditer(lower)}
 
 
 def text_requests_meet(text: str) -> bool:
     if not text:
         return False
-    lower = text.lower()
-    keywords = [
-        "google meet",
-        "гугл міт",
-        "міт",
-        "meet",
-        "онлайн зустріч",
-        "онлайн-зустріч",
-        "дзвінок",
-        "дзвонок",
-        "зум",
-        "zoom",
-        "відеодзвінок",
-        "потрібен лінк",
-        "потрібне посилання",
-        "посилання на зустріч",
-    ]
-    triggers = ["додай міт", "додай meet", "зроби meet", "міт треба", "meet треба"]
-    if any(trigger in lower for trigger in triggers):
-        return True
-    return any(keyword in lower for keyword in keywords)
+    return _MEET_PATTERN.search(text.lower()) is not None
 
 
 def text_requests_remove_meet(text: str) -> bool:
     if not text:
         return False
-    lower = text.lower()
-    keywords = [
-        "без meet",
-        "без міт",
-        "прибери meet",
-        "прибери міт",
-        "видали meet",
-        "видали міт",
-        "скасуй meet",
-        "скасуй міт",
-        "відключи meet",
-        "без посилання",
-    ]
-    return any(keyword in lower for keyword in keywords)
+    return _REMOVE_MEET_PATTERN.search(text.lower()) is not None
 
 
 def format_events_list(
@@ -1018,40 +1103,47 @@ def format_events_list(
     else:
         header = f"Події з {start:%d.%m.%Y %H:%M} до {end:%d.%m.%Y %H:%M}:"
     lines = [header]
-    total = len(events)
     for idx, event in enumerate(events):
-        start_str = format_iso_datetime(event.start)
-        end_str = format_iso_datetime(event.end)
-        summary = event.summary
-        link = event.html_link
-        if link:
-            lines.append(f"• {summary} — {start_str} → {end_str} ({link})")
-        else:
-            lines.append(f"• {summary} — {start_str} → {end_str}")
-        _append_event_details(lines, event)
-        if idx < total - 1:
-            lines.append("────────────────────")
+        if idx:
+            lines.append(_EVENT_SEPARATOR)
+        _append_event_row(lines, event)
     return "\n".join(lines)
 
 
+def _append_event_row(lines: list[str], event: CalendarEvent) -> None:
+    link = event.html_link
+    lines.append(
+        _EVENT_LINE_TEMPLATE.format(
+            summary=event.summary,
+            start=format_iso_datetime(event.start),
+            end=format_iso_datetime(event.end),
+            link=f" ({link})" if link else "",
+        )
+    )
+    _append_event_details(lines, event)
+
+
 def format_iso_datetime(payload: dict[str, Any]) -> str:
-    value = payload.get("dateTime") or payload.get("date")
+    date_time = payload.get("dateTime")
+    value = date_time or payload.get("date")
     if not value:
         return "невідомо"
+    return _format_iso_value(value, bool(date_time))
+
+
+@lru_cache(maxsize=4096)
+def _format_iso_value(value: str, with_time: bool) -> str:
+    # Тип значення відомий наперед, тому дату без часу розбираємо як date
     try:
-        dt = datetime.fromisoformat(value)
+        if with_time:
+            return datetime.fromisoformat(value).strftime("%d.%m.%Y %H:%M")
+        return date.fromisoformat(value).strftime("%d.%m.%Y")
     except ValueError:
         return value
-    if payload.get("dateTime"):
-        return dt.strftime("%d.%m.%Y %H:%M")
-    return dt.strftime("%d.%m.%Y")
 
 
-def event_reminder_label(event: CalendarEvent | dict[str, Any]) -> str:
-    if isinstance(event, CalendarEvent):
-        config = event.reminders
-    else:
-        config = _ensure_reminders_config(event.get("reminders"))
+def event_reminder_label(event: CalendarEvent) -> str:
+    config = event.reminders
     if config is None:
         return ""
     minutes = config.first_override_minutes()
@@ -1062,20 +1154,17 @@ def event_reminder_label(event: CalendarEvent | dict[str, Any]) -> str:
     return _reminder_label_from_minutes(minutes)
 
 
-def _append_event_details(lines: list[str], event: CalendarEvent | dict[str, Any]) -> None:
+def _append_event_details(lines: list[str], event: CalendarEvent) -> None:
     reminder_label = event_reminder_label(event)
     if reminder_label:
         lines.append(f"  {reminder_label}")
-    if isinstance(event, CalendarEvent):
-        meet_link = event.hangout_link
-    else:
-        meet_link = event.get("hangoutLink")
+    meet_link = event.hangout_link
     if meet_link:
         lines.append(f"  🔗 Google Meet: {meet_link}")
 
 
-def _parse_duration_minutes(text: str) -> int | None:
-    match = re.search(r"(\d+)\s*(хв|хвилин|год|години)", text.lower())
+def _parse_duration_minutes(lower: str) -> int | None:
+    match = _DURATION_PATTERN.search(lower)
     if not match:
         return None
     value = int(match.group(1))
@@ -1085,6 +1174,17 @@ def _parse_duration_minutes(text: str) -> int | None:
     return value
 
 
+def _drop_empty_values(patch: dict[str, Any]) -> dict[str, Any]:
+    for key in [key for key, value in patch.items() if _is_empty_value(value)]:
+        del patch[key]
+    return patch
+
+
+def _is_empty_value(value: Any) -> bool:
+    # Порожній список не хешується, тому frozenset тут не підходить
+    return value is None or value == "" or value == []
+
+
 def _safe_int_value(value: Any) -> int | None:
     if value is None:
         return None
@@ -1097,18 +1197,14 @@ def _safe_int_value(value: Any) -> int | None:
 def _infer_category_from_text(text: str) -> str | None:
     if not text:
         return None
-    lower = text.lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in lower:
-                return category
-    if "зустріч" in lower or "call" in lower:
-        return "meeting"
-    if "спорт" in lower or "тренув" in lower:
-        return "sport"
-    if "лекц" in lower or "пара" in lower or "семінар" in lower:
-        return "study"
-    return None
+    return _category_from_lower(text.lower())
+
+
+def _category_from_lower(lower: str) -> str | None:
+    found = {match.lastgroup for match in _CATEGORY_PATTERN.finditer(lower)}
+    if not found:
+        return None
+    return next(category for group, category, _ in _CATEGORY_GROUPS if group in found)
 
 
 def _color_id_from_category(category: str | None) -> str | None:
@@ -1117,9 +1213,9 @@ def _color_id_from_category(category: str | None) -> str | None:
     return CATEGORY_COLOR_MAP.get(category.lower())
 
 
-def _resolve_color_id(event: EventProposal | None, text: str) -> str | None:
+def _resolve_color_id(event: EventProposal | None, lower_text: str) -> str | None:
     category = event.category if event and event.category else None
-    inferred_category = category or _infer_category_from_text(text)
+    inferred_category = category or _category_from_lower(lower_text)
     return _color_id_from_category(inferred_category)
 
 
@@ -1127,19 +1223,18 @@ def _build_event_times(event: EventProposal, settings: Settings) -> tuple[dateti
     if not event.date:
         return None, None
 
-    tz = ZoneInfo(settings.timezone)
+    tz = settings.tzinfo
+    # Дату розбираємо один раз, а час початку й кінця лише комбінуємо з нею
     try:
-        if event.start_time:
-            start_dt = datetime.fromisoformat(f"{event.date}T{event.start_time}")
-        else:
-            start_dt = datetime.fromisoformat(f"{event.date}T09:00")
-        start_dt = start_dt.replace(tzinfo=tz)
+        day = date.fromisoformat(event.date)
+        start_time = time.fromisoformat(event.start_time) if event.start_time else _DEFAULT_START_TIME
     except ValueError:
         return None, None
+    start_dt = datetime.combine(day, start_time, tzinfo=tz)
 
     if event.end_time:
         try:
-            end_dt = datetime.fromisoformat(f"{event.date}T{event.end_time}").replace(tzinfo=tz)
+            end_dt = datetime.combine(day, time.fromisoformat(event.end_time), tzinfo=tz)
         except ValueError:
             return None, None
     else:
@@ -1151,61 +1246,77 @@ def _build_event_times(event: EventProposal, settings: Settings) -> tuple[dateti
     return start_dt, end_dt
 
 
+def _complete_event_draft(
+    services: ServiceContainer,
+    draft: EventDraft,
+    event: EventProposal,
+    lower_text: str,
+) -> None:
+    if event.recurrence:
+        draft.recurrence = _build_recurrence_rule(event.recurrence)
+    if _should_attach_meet(event, lower_text):
+        draft.conference_data = services.calendar.build_conference_data()
+    draft.color_id = _resolve_color_id(event, lower_text)
+    draft.reminders = _build_reminders_payload(event, lower_text)
+
+
+def _datetime_payload(value: datetime, timezone: str) -> dict[str, str]:
+    # Google Calendar не потребує мікросекунд, тож форматуємо лише до секунд
+    return {"dateTime": value.isoformat(timespec="seconds"), "timeZone": timezone}
+
+
 def _build_recurrence_rule(recurrence_type: str) -> list[str]:
-    if recurrence_type == "daily":
-        return ["RRULE:FREQ=DAILY;COUNT=30"]
-    if recurrence_type == "weekly":
-        return ["RRULE:FREQ=WEEKLY;COUNT=12"]
-    if recurrence_type == "monthly":
-        return ["RRULE:FREQ=MONTHLY;COUNT=6"]
+    preset = _RECURRENCE_RULES.get(recurrence_type)
+    if preset:
+        return [preset[0]]
     return [f"RRULE:{recurrence_type}"]
 
 
-def _should_attach_meet(event: EventProposal | None, text: str) -> bool:
+def _recurrence_label(rule: str) -> str | None:
+    label = _RECURRENCE_LABELS.get(rule)
+    if label:
+        return label
+    # Власні правила (наприклад, з INTERVAL) підписуємо за частотою
+    preset = _RECURRENCE_RULES.get(rule.replace("RRULE:FREQ=", "").split(";")[0].lower())
+    return preset[1] if preset else None
+
+
+def _should_attach_meet(event: EventProposal | None, lower_text: str) -> bool:
     if event and event.needs_meet:
         return True
-    return text_requests_meet(text)
+    return _MEET_PATTERN.search(lower_text) is not None
 
 
-def _build_reminders_payload(event: EventProposal | None, text: str) -> RemindersConfig | None:
+def _build_reminders_payload(event: EventProposal | None, lower_text: str) -> RemindersConfig | None:
     minutes = event.reminder_minutes if event else None
     if minutes is None:
-        minutes = _parse_reminder_from_text(text)
+        minutes = _reminder_minutes_from_lower(lower_text)
     if minutes is None:
         minutes = DEFAULT_REMINDER_MINUTES
-    return RemindersConfig.from_minutes(minutes)
+    return _cached_reminders_from_minutes(minutes)
 
 
 def _build_reminders_from_minutes(minutes: int | None) -> RemindersConfig | None:
     if minutes is None:
         return None
-    return RemindersConfig.from_minutes(minutes)
+    return _cached_reminders_from_minutes(minutes)
 
 
-def _parse_reminder_from_text(text: str) -> int | None:
-    if not text:
-        return None
-    lower = text.lower()
-    removal_keywords = (
-        "без нагад",
-        "прибери нагад",
-        "видали нагад",
-        "скасуй нагад",
-        "нагадування не треба",
-        "нагадування не потрібно",
-    )
-    if any(phrase in lower for phrase in removal_keywords):
+def _reminder_minutes_from_lower(lower: str) -> int | None:
+    if _REMINDER_REMOVAL_PATTERN.search(lower):
         return 0
-    pattern = r"нагад\w*.*?(?:за|перед)\s*(\d+)\s*(хв|хвилин|год|години)"
-    match = re.search(pattern, lower)
+    return _reminder_offset_from_lower(lower)
+
+
+def _reminder_offset_from_lower(lower: str) -> int | None:
+    match = _REMINDER_PATTERN.search(lower)
     if match:
         value = int(match.group(1))
         unit = match.group(2)
         if unit.startswith("год"):
             value *= 60
         return value
-    pattern_short = r"за\s+(\d+)\s*(хв|хвилин|год|години)\s+до"
-    match = re.search(pattern_short, lower)
+    match = _REMINDER_SHORT_PATTERN.search(lower)
     if match:
         value = int(match.group(1))
         unit = match.group(2)
@@ -1243,35 +1354,67 @@ def _reminder_label_from_minutes(minutes: int | None) -> str:
     return f"🔔 Нагадування за {minutes} хв."
 
 
+def _as_calendar_event(event: CalendarEvent | dict[str, Any]) -> CalendarEvent:
+    # Словник може прийти лише зі збереженого стану розмови; далі працюємо з CalendarEvent
+    if isinstance(event, CalendarEvent):
+        return event
+    return CalendarEvent.from_api(event)
+
+
 def _ensure_reminders_config(
     reminders: RemindersConfig | dict[str, Any] | list[dict[str, Any]] | None
 ) -> RemindersConfig | None:
     if reminders is None:
         return None
-    if isinstance(reminders, RemindersConfig):
-        return reminders
-    if isinstance(reminders, dict):
-        return RemindersConfig.from_api(reminders)
-    if isinstance(reminders, list):
-        overrides = [ReminderOverride.from_api(item) for item in reminders]
-        return RemindersConfig(overrides=overrides, use_default=False)
-    return None
+    convert = _REMINDERS_CONVERTERS.get(type(reminders))
+    if convert is None:
+        # Підкласи (наприклад, OrderedDict) трапляються рідко, для них лишаємо isinstance
+        convert = next(
+            (func for kind, func in _REMINDERS_CONVERTERS.items() if isinstance(reminders, kind)),
+            None,
+        )
+    return convert(reminders) if convert else None
+
+
+def _reminders_from_overrides(reminders: list[dict[str, Any]]) -> RemindersConfig:
+    overrides = [ReminderOverride.from_api(item) for item in reminders]
+    return RemindersConfig(overrides=overrides, use_default=False)
+
+
+_REMINDERS_CONVERTERS: dict[type, Callable[[Any], RemindersConfig]] = {
+    RemindersConfig: lambda reminders: reminders,
+    dict: RemindersConfig.from_api,
+    list: _reminders_from_overrides,
+}
 
 
 def _parse_google_datetime(payload: dict[str, Any], tz: ZoneInfo) -> datetime | None:
-    value = payload.get("dateTime") or payload.get("date")
-    if not value:
-        return None
-    try:
-        dt = datetime.fromisoformat(value)
-    except ValueError:
+    date_time = payload.get("dateTime")
+    if date_time:
         try:
-            dt = datetime.fromisoformat(f"{value}T00:00:00")
+            dt = datetime.fromisoformat(date_time)
         except ValueError:
             return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=tz)
-    return dt
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=tz)
+    # Події на весь день мають лише "date"
+    day = payload.get("date")
+    if not day:
+        return None
+    try:
+        return datetime.combine(date.fromisoformat(day), time.min, tzinfo=tz)
+    except ValueError:
+        return None
+
+
+def _iso_not_after(earlier: Any, later: Any) -> bool:
+    # Рядки ISO однакової довжини з тим самим зсувом упорядковуються так само, як час
+    return (
+        isinstance(earlier, str)
+        and isinstance(later, str)
+        and len(earlier) == len(later)
+        and earlier[19:] == later[19:]
+        and earlier <= later
+    )
 
 
 async def _detect_conflict(
@@ -1281,20 +1424,33 @@ async def _detect_conflict(
     end_dt: datetime,
     exclude_event_id: str | None = None,
 ) -> dict[str, Any] | None:
-    tz = ZoneInfo(services.settings.timezone)
-    window_start = start_dt - timedelta(minutes=1)
-    window_end = end_dt + timedelta(minutes=1)
-    events = await services.calendar.list_events_between(
+    tz = services.settings.tzinfo
+    # Межі вікна округлюємо до хвилин, щоб близькі повторні перевірки брали список із кешу
+    window_start = (start_dt - timedelta(minutes=1)).replace(second=0, microsecond=0)
+    window_end = (end_dt + timedelta(minutes=2)).replace(second=0, microsecond=0)
+    events = await services.calendar.conflict_cache.get_or_fetch(
         telegram_id,
         window_start,
         window_end,
-        max_results=20,
+        lambda: services.calendar.list_events_between(
+            telegram_id,
+            window_start,
+            window_end,
+            max_results=20,
+        ),
     )
+    start_iso = start_dt.isoformat()
+    end_iso = end_dt.isoformat()
     for item in events:
         if item.raw.get("status") == "cancelled":
             continue
         if exclude_event_id and item.id == exclude_event_id:
             continue
+        # API повертає події з хвилинним запасом; ті, що лише торкаються меж, відкидаємо без парсингу
+        if _iso_not_after(item.end.get("dateTime"), start_iso) or _iso_not_after(
+            end_iso, item.start.get("dateTime")
+        ):
+            continue
         existing_start = _parse_google_datetime(item.start, tz)
         existing_end = _parse_google_datetime(item.end, tz)
         if not existing_start or not existing_end:
@@ -1327,14 +1483,7 @@ async def _create_event_with_payload(
     reply = reply_text or "Подію створено."
     recurrence_rules = kwargs.get("recurrence")
     if recurrence_rules:
-        recurrence_text = {
-            "daily": "щодня",
-            "weekly": "щотижня",
-            "monthly": "щомісяця",
-        }.get(
-            recurrence_rules[0].replace("RRULE:FREQ=", "").split(";")[0].lower(),
-            None,
-        )
+        recurrence_text = _recurrence_label(recurrence_rules[0])
         if recurrence_text:
             reply += f" ({recurrence_text})"
     link = created.html_link
@@ -1353,7 +1502,7 @@ async def _create_event_with_payload(
 
     set_last_event_query(context, draft.summary)
     set_last_event_context(context, created.id, draft.summary)
-    context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
+    clear_free_slot_expectation(context)
 
 
 async def _apply_event_update(
@@ -1361,7 +1510,7 @@ async def _apply_event_update(
     telegram_id: int,
     event_id: str,
     original_event: CalendarEvent | dict[str, Any],
-    update_data: dict[str, Any],
+    update_data: Mapping[str, Any],
     *,
     add_meet: bool = False,
     remove_meet: bool = False,
@@ -1369,22 +1518,14 @@ async def _apply_event_update(
     reminders: RemindersConfig | None = None,
     clear_reminders: bool = False,
     ignore_conflicts: bool = False,
+    original_is_current: bool = False,
 ) -> CalendarEvent:
-    tz = ZoneInfo(services.settings.timezone)
+    tz = services.settings.tzinfo
     update_kwargs: dict[str, Any] = {}
+    original_event = _as_calendar_event(original_event)
 
-    def _parse(payload: CalendarEvent | dict[str, Any]) -> tuple[datetime | None, datetime | None]:
-        if isinstance(payload, CalendarEvent):
-            start_payload = payload.start
-            end_payload = payload.end
-        else:
-            start_payload = payload.get("start", {})
-            end_payload = payload.get("end", {})
-        start = _parse_google_datetime(start_payload, tz)
-        end = _parse_google_datetime(end_payload, tz)
-        return start, end
-
-    original_start, original_end = _parse(original_event)
+    original_start = _parse_google_datetime(original_event.start, tz)
+    original_end = _parse_google_datetime(original_event.end, tz)
     new_start, new_end = original_start, original_end
 
     has_absolute_time = False
@@ -1418,16 +1559,11 @@ async def _apply_event_update(
     if duration_minutes and new_start:
         new_end = new_start + timedelta(minutes=duration_minutes)
 
+    timezone = services.settings.timezone
     if new_start:
-        update_kwargs["start"] = {
-            "dateTime": new_start.isoformat(),
-            "timeZone": services.settings.timezone,
-        }
+        update_kwargs["start"] = _datetime_payload(new_start, timezone)
     if new_end:
-        update_kwargs["end"] = {
-            "dateTime": new_end.isoformat(),
-            "timeZone": services.settings.timezone,
-        }
+        update_kwargs["end"] = _datetime_payload(new_end, timezone)
 
     if "title" in update_data:
         update_kwargs["summary"] = update_data["title"]
@@ -1459,84 +1595,57 @@ async def _apply_event_update(
         if conflict:
             raise UpdateConflictDetected(conflict)
 
+    if original_is_current:
+        update_kwargs["current"] = original_event.as_dict()
+
     updated_event = await services.calendar.update_event(telegram_id, event_id, **update_kwargs)
     return updated_event
 
 
-def _parse_absolute_time_from_text(text: str, reference_datetime: datetime | None = None) -> datetime | None:
-    if not text:
+def _parse_absolute_time_from_text(lower: str, reference_datetime: datetime | None = None) -> datetime | None:
+    if not lower:
         return None
     
-    lower = text.lower()
-    tz = reference_datetime.tzinfo if reference_datetime else ZoneInfo("Europe/Kyiv")
+    tz = reference_datetime.tzinfo if reference_datetime else _KYIV_TZ
     ref = reference_datetime or datetime.now(tz)
     
-    match = re.search(r"на\s+(\d{1,2}):(\d{2})", lower)
-    if match:
-        try:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            hour = hour % 24
-            minute = min(59, max(0, minute))
-            return ref.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        except (ValueError, IndexError):
-            pass
-    
-    match = re.search(r"о\s+(\d{1,2})[:.](\d{2})", lower)
-    if match:
-        try:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            hour = hour % 24
-            minute = min(59, max(0, minute))
-            return ref.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        except (ValueError, IndexError):
-            pass
-    
-    match = re.search(r"на\s+(\d{1,2})(?:\s*(?:вечора|ранку|дня|ночі|год|години))?", lower)
-    if match:
-        try:
-            hour = int(match.group(1))
-            minute = 0
-            
-            if "вечора" in lower or "ночі" in lower:
-                if hour < 12:
-                    hour += 12
-            elif "ранку" in lower or "дня" in lower:
-                pass
-            elif hour < 8 and hour > 0:
+    first_matches: dict[str, re.Match[str]] = {}
+    for match in _ABSOLUTE_TIME_PATTERN.finditer(lower):
+        first_matches.setdefault(match.lastgroup, match)
+        if match.lastgroup == "on_hm":
+            break
+    kind = next((name for name in _ABSOLUTE_TIME_PRIORITY if name in first_matches), None)
+    if kind is None:
+        return None
+    match = first_matches[kind]
+    hour = int(match.group(f"{kind}_hour"))
+
+    if kind in ("on_hm", "at_hm"):
+        minute = min(59, max(0, int(match.group(f"{kind}_minute"))))
+    elif kind == "on_h":
+        minute = 0
+        if "вечора" in lower or "ночі" in lower:
+            if hour < 12:
                 hour += 12
-            
-            hour = hour % 24
-            return ref.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        except (ValueError, IndexError):
-            pass
-    
-    match = re.search(r"о\s+(\d{1,2})(?:[:.](\d{2}))?(?:\s*(?:вечора|ранку|дня|ночі|год))?", lower)
-    if match:
-        try:
-            hour = int(match.group(1))
-            minute = 0
-            if match.group(2):
-                minute = int(match.group(2))
-            
-            if "вечора" in lower or "ночі" in lower:
-                if hour < 12:
-                    hour += 12
-            
-            hour = hour % 24
-            minute = min(59, max(0, minute))
-            return ref.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        except (ValueError, IndexError):
+        elif "ранку" in lower or "дня" in lower:
             pass
-    
-    return None
+        elif hour < 8 and hour > 0:
+            hour += 12
+    else:
+        minute = 0
+        if "вечора" in lower or "ночі" in lower:
+            if hour < 12:
+                hour += 12
 
+    hour = hour % 24
+    return ref.replace(hour=hour, minute=minute, second=0, microsecond=0)
 
-def _parse_time_shift(text: str) -> int | None:
-    lower = text.lower()
-    pattern = r"на\s+(?:([\d]+|[а-яіїєґ'’`]+)\s*)?(год|годин|години|годину|хв|хвилин|хвилини|хвилину)\s*(пізніше|пізнише|пізн|позд|раніше|ранише|скоріше|скорше)"
-    match = re.search(pattern, lower)
+
+def _parse_time_shift(lower: str) -> int | None:
+    # Без слова напрямку зсуву повний шаблон не може збігтися, тож не запускаємо його
+    if not _TIME_SHIFT_DIRECTION_PATTERN.search(lower):
+        return None
+    match = _TIME_SHIFT_PATTERN.search(lower)
     if not match:
         return None
     amount_token = match.group(1)
@@ -1559,23 +1668,7 @@ def _parse_time_shift(text: str) -> int | None:
 
 
 def _word_to_number(word: str) -> float | None:
-    mapping = {
-        "одна": 1,
-        "одну": 1,
-        "один": 1,
-        "пів": 0.5,
-        "півгодини": 0.5,
-        "півгодину": 0.5,
-        "півтори": 1.5,
-        "дві": 2,
-        "двіє": 2,
-        "двох": 2,
-        "два": 2,
-        "три": 3,
-        "чотири": 4,
-        "чотирьох": 4,
-    }
-    return mapping.get(word.strip(" '’`"))
+    return _NUMBER_WORDS.get(word.strip(" '’`"))
 
 
 async def _search_events_with_fallback(
@@ -1584,6 +1677,25 @@ async def _search_events_with_fallback(
     keywords: str,
     *,
     max_results: int = 10,
+) -> tuple[list[CalendarEvent], str]:
+    # Однакові пошуки, що виконуються одночасно (напр. повторне повідомлення), чекають один запит
+    key = (telegram_id, keywords, max_results)
+    task = _inflight_searches.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _run_search_with_fallback(services, telegram_id, keywords, max_results=max_results)
+        )
+        _inflight_searches[key] = task
+        task.add_done_callback(lambda _: _inflight_searches.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _run_search_with_fallback(
+    services: ServiceContainer,
+    telegram_id: int,
+    keywords: str,
+    *,
+    max_results: int,
 ) -> tuple[list[CalendarEvent], str]:
     candidates: list[str] = []
     base = (keywords or "").strip()
@@ -1595,19 +1707,26 @@ async def _search_events_with_fallback(
     else:
         candidates.append("")
 
-    seen: set[str] = set()
+    queries: list[str] = []
     for candidate in candidates:
         normalized_candidate = candidate.strip()
-        if len(normalized_candidate) < 2 or normalized_candidate in seen:
+        if len(normalized_candidate) < 2 or normalized_candidate in queries:
             continue
-        seen.add(normalized_candidate)
-        events = await services.calendar.search_events(
-            telegram_id,
-            normalized_candidate,
-            max_results=max_results,
-        )
+        queries.append(normalized_candidate)
+
+    # Варіанти запиту відправляємо паралельно, але пріоритет лишається за порядком кандидатів
+    results = await asyncio.gather(
+        *(
+            services.calendar.search_events(telegram_id, query, max_results=max_results)
+            for query in queries
+        ),
+        return_exceptions=True,
+    )
+    for query, events in zip(queries, results):
+        if isinstance(events, BaseException):
+            raise events
         if events:
-            return events, normalized_candidate
+            return events, query
 
     return [], base
 
@@ -1616,12 +1735,10 @@ def _normalize_keywords(text: str) -> str:
     cleaned = (text or "").strip()
     if not cleaned:
         return ""
-    cleaned = re.sub(r"[\"'«»“”]", "", cleaned)
-    cleaned = re.sub(r"\s+", " ", cleaned)
-    suffixes = ("а", "я", "у", "ю", "і", "ї", "е", "о", "и", "ь")
-    for suffix in suffixes:
-        if cleaned.lower().endswith(suffix) and len(cleaned) > 2:
-            return cleaned[:-1]
+    cleaned = _QUOTES_PATTERN.sub("", cleaned)
+    cleaned = _WHITESPACE_PATTERN.sub(" ", cleaned)
+    if len(cleaned) > 2:
+        return _KEYWORD_SUFFIX_PATTERN.sub("", cleaned, count=1)
     return cleaned
 
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import replace
-from datetime import datetime, timedelta
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 import re
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 from zoneinfo import ZoneInfo
 
 from telegram import Update
@@ -13,12 +15,107 @@ from app.bot.context import (
     FREE_SLOT_EXPECTATION_KEY,
     LastFreeSlotsContext,
     LastFreeSlotsRequest,
+    clear_free_slot_expectation,
     get_last_free_slots,
     set_last_free_slots,
 )
-from app.services.free_slots import FreeSlot, FreeSlotRequest, FreeSlotService
+from app.services.free_slots import FreeSlotRequest, FreeSlotService
 from app.services.gemini import GeminiAnalysisResult
 
+_TIME_RANGE_PATTERN = re.compile(r"з\s*(\d{1,2})(?::(\d{2}))?\s*(?:до|по)\s*(\d{1,2})")
+_TIME_FROM_PATTERN = re.compile(r"з\s*(\d{1,2})(?::(\d{2}))?")
+_HOURS_PATTERN = re.compile(r"(\d+)(?:\s*год|\s*h)")
+_MINUTES_PATTERN = re.compile(r"(\d+)(?:\s*хв|\s*min)")
+_UTC = ZoneInfo("UTC")
+
+# Ключові слова всіх текстових евристик модуля: тег -> підрядки
+_TEXT_KEYWORDS: Mapping[str, tuple[str, ...]] = MappingProxyType({
+    "last_slot": (
+        "туди",
+        "сюди",
+        "туда",
+        "туди ж",
+        "цей час",
+        "в цей час",
+        "у цей час",
+        "це вікно",
+        "цей варіант",
+        "перший варіант",
+        "знайдений час",
+        "знайдене вікно",
+        "на цей час",
+        "тоді",
+        "той час",
+    ),
+    "window_evening": ("веч", "ніч"),
+    "window_morning": ("ран", "утр"),
+    "window_day": ("день", "вдень"),
+    "today": ("сьогодні",),
+    "tomorrow": ("завтра",),
+    "day_after_tomorrow": ("післязавтра",),
+    "weekday_0": ("понеділ",),
+    "weekday_1": ("вівтор",),
+    "weekday_2": ("серед",),
+    "weekday_3": ("четвер",),
+    "weekday_4": ("п'ятн", "пятн"),
+    "weekday_5": ("субот",),
+    "weekday_6": ("неділ",),
+})
+_WINDOW_HOURS: Mapping[str, tuple[int, int]] = MappingProxyType({
+    "morning": (6, 12),
+    "day": (12, 18),
+    "evening": (18, 22),
+    "night": (21, 24),
+})
+_WINDOW_RANGES: Mapping[str, tuple[time, time, str]] = MappingProxyType({
+    "morning": (time(6), time(12), "зранку"),
+    "day": (time(12), time(18), "вдень"),
+    "evening": (time(18), time(22), "увечері"),
+    "night": (time(22), time(23, 59), "у вечірньо-нічному проміжку"),
+})
+_WHOLE_DAY_RANGE = (time(0), time(23, 59), "протягом дня")
+_WINDOW_DESCRIPTIONS: Mapping[str, str] = MappingProxyType({
+    "morning": "зранку (06:00-12:00)",
+    "day": "вдень (12:00-18:00)",
+    "evening": "увечері (18:00-22:00)",
+    "night": "у вечірньо-нічному проміжку",
+})
+_DURATION_WORDS: Mapping[str, int] = MappingProxyType({"одну": 60, "один": 60, "дві": 120, "две": 120, "три": 180})
+_WEEKDAY_TAGS = tuple(f"weekday_{target}" for target in range(7))
+# Lookahead перевіряє кожну позицію, тому один прохід знаходить усі теги, навіть вкладені
+# ("неділ" всередині "понеділ", "завтра" всередині "післязавтра")
+_TEXT_KEYWORDS_PATTERN = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<{tag}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+        for tag, keywords in _TEXT_KEYWORDS.items()
+    )
+    + ")"
+)
+
+
+@dataclass(slots=True)
+class _TextFeatures:
+    lower: str
+    duration_minutes: int | None
+    window: str | None
+    range_start: datetime | None
+    range_end: datetime | None
+
+
+def _analyze_text(text: str, now: datetime) -> _TextFeatures:
+    # Усі текстові ознаки запиту за одне приведення до нижнього регістру та одне сканування
+    lower = text.lower()
+    tags = _scan_text(lower)
+    range_start, range_end = _range_from_tags(tags, now)
+    return _TextFeatures(
+        lower=lower,
+        duration_minutes=_duration_from_lower(lower),
+        window=_window_from_tags(tags),
+        range_start=range_start,
+        range_end=range_end,
+    )
+
 
 async def handle_free_slots(
     update: Update,
@@ -30,7 +127,7 @@ async def handle_free_slots(
     message = update.effective_message
     telegram_id = update.effective_user.id
 
-    tz = ZoneInfo(services.settings.timezone)
+    tz = services.settings.tzinfo
     now = datetime.now(tz)
     metadata = dict(analysis.metadata or {})
 
@@ -40,13 +137,20 @@ async def handle_free_slots(
     last_request_saved = last_context.request.as_dict() if last_context else {}
     fallback_request = pending_request or last_request_saved
 
-    duration = _extract_duration_minutes(metadata, original_text)
+    features = _analyze_text(original_text, now)
+    inferred_range = (features.range_start, features.range_end)
+
+    duration = _duration_from_metadata(metadata)
+    if duration is None:
+        duration = features.duration_minutes
     if not duration:
         duration = pending_request.get("duration")
     if not duration:
-        temp_date_from, temp_date_to = _extract_date_range(metadata, original_text, now, None)
-        temp_window = metadata.get("preferred_window") or _detect_window_from_text(original_text)
-        temp_explicit = _extract_custom_time_range(original_text, 60)
+        temp_date_from, temp_date_to = _extract_date_range(
+            metadata, now, None, inferred_range
+        )
+        temp_window = metadata.get("preferred_window") or features.window
+        temp_explicit = _custom_time_range_from_lower(features.lower, 60)
         pref_start, pref_end = _resolve_preferred_hours(temp_explicit, temp_window, None, None)
         context.user_data["pending_free_slot"] = {
             "request": {
@@ -62,12 +166,14 @@ async def handle_free_slots(
         return
     duration = int(duration)
 
-    date_from, date_to = _extract_date_range(metadata, original_text, now, fallback_request)
+    date_from, date_to = _extract_date_range(
+        metadata, now, fallback_request, inferred_range
+    )
 
-    explicit_range = _extract_custom_time_range(original_text, duration)
+    explicit_range = _custom_time_range_from_lower(features.lower, duration)
     preferred_window = (
         metadata.get("preferred_window")
-        or _detect_window_from_text(original_text)
+        or features.window
         or fallback_request.get("preferred_window")
     )
     preferred_start = fallback_request.get("preferred_start")
@@ -103,13 +209,13 @@ async def handle_free_slots(
     set_last_free_slots(
         context,
         LastFreeSlotsContext(
-            slots=[slot for slot in slots],
+            slots=slots,
             request=request_state,
             awaiting_use=bool(slots),
         ),
     )
     context.user_data.pop("pending_free_slot", None)
-    context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
+    clear_free_slot_expectation(context)
 
 
 async def handle_more_free_slots(
@@ -131,7 +237,7 @@ async def handle_more_free_slots(
         await message.reply_text("Спочатку попроси мене знайти вільний час через /window.")
         return
 
-    tz = ZoneInfo(services.settings.timezone)
+    tz = services.settings.tzinfo
     original_date_from = _parse_iso_datetime(req.date_from, tz) or datetime.now(tz)
     original_date_to = _parse_iso_datetime(req.date_to, tz) or (original_date_from + timedelta(days=7))
     history_raw = req.cursor_history or [req.date_from]
@@ -215,7 +321,7 @@ async def handle_more_free_slots(
     set_last_free_slots(
         context,
         LastFreeSlotsContext(
-            slots=[slot for slot in slots],
+            slots=slots,
             request=updated_request,
             awaiting_use=bool(slots),
         ),
@@ -230,7 +336,7 @@ def pick_slot_from_context(
     info = get_last_free_slots(context)
     if not info:
         return None
-    slots: list[FreeSlot | str] = info.slots or []
+    slots = info.slots
     if not slots:
         return None
     awaiting_use = info.awaiting_use
@@ -238,11 +344,9 @@ def pick_slot_from_context(
         return None
 
     slot = slots[0]
-    if not isinstance(slot, FreeSlot):
-        return None
     start = slot.start
     end = slot.end
-    tz = ZoneInfo(settings.timezone)
+    tz = settings.tzinfo
     if start.tzinfo is None:
         start = start.replace(tzinfo=tz)
     if end.tzinfo is None:
@@ -252,36 +356,24 @@ def pick_slot_from_context(
     info.slots = remaining
     info.awaiting_use = bool(remaining)
     set_last_free_slots(context, info)
-    context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
+    clear_free_slot_expectation(context)
     return start, end
 
 
 def text_refers_to_last_slot(text: str) -> bool:
     if not text:
         return False
-    lower = text.lower()
-    keywords = [
-        "туди",
-        "сюди",
-        "туда",
-        "туди ж",
-        "цей час",
-        "в цей час",
-        "у цей час",
-        "це вікно",
-        "цей варіант",
-        "перший варіант",
-        "знайдений час",
-        "знайдене вікно",
-        "на цей час",
-        "тоді",
-        "той час",
-    ]
-    return any(keyword in lower for keyword in keywords)
+    return "last_slot" in _scan_text(text.lower())
+
+
+# Одне повідомлення перевіряють кілька евристик поспіль, тож результат сканування кешуємо
+@lru_cache(maxsize=256)
+def _scan_text(lower: str) -> frozenset[str]:
+    return frozenset(match.lastgroup for match in _TEXT_KEYWORDS_PATTERN.finditer(lower))
 
 
 def explain_last_free_slots(info: LastFreeSlotsContext | None, settings) -> str:
-    tz = ZoneInfo(settings.timezone)
+    tz = settings.tzinfo
     if info is None or not info.slots:
         return "Вільних вікон у попередньому проміжку не виявлено: календар зайнятий."
 
@@ -297,51 +389,35 @@ def explain_last_free_slots(info: LastFreeSlotsContext | None, settings) -> str:
 
     window_text = "протягом дня"
     if preferred_window:
-        window_map = {
-            "morning": "зранку (06:00-12:00)",
-            "day": "вдень (12:00-18:00)",
-            "evening": "увечері (18:00-22:00)",
-            "night": "у вечірньо-нічному проміжку",
-        }
-        window_text = window_map.get(preferred_window, "протягом дня")
-
-    slot_lines = []
-    for slot in info.slots:
-        if isinstance(slot, FreeSlot):
-            slot_lines.append(f"• {slot.start:%d.%m %H:%M} — {slot.end:%H:%M}")
-        elif isinstance(slot, str):
-            slot_lines.append(slot)
-
-    reply = [
-        f"Пошук виконувався на {duration} хв {range_text}",
-        f"з пріоритетом {window_text}.",
-        "Вільні вікна:",
-    ]
-    reply.extend(slot_lines)
-    reply.append("Інші часові відрізки виявились зайнятими у календарі.")
-    return "\n".join(reply)
+        window_text = _WINDOW_DESCRIPTIONS.get(preferred_window, "протягом дня")
+
+    return "\n".join(
+        [
+            f"Пошук виконувався на {duration} хв {range_text}",
+            f"з пріоритетом {window_text}.",
+            "Вільні вікна:",
+            *(slot.to_message_line() for slot in info.slots),
+            "Інші часові відрізки виявились зайнятими у календарі.",
+        ]
+    )
 
 
 def build_window_range(date_dt: datetime, window: str) -> tuple[datetime, datetime, str]:
-    tz = date_dt.tzinfo or ZoneInfo("UTC")
+    tz = date_dt.tzinfo or _UTC
     day_start = date_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-    mapping = {
-        "morning": (day_start.replace(hour=6), day_start.replace(hour=12), "зранку"),
-        "day": (day_start.replace(hour=12), day_start.replace(hour=18), "вдень"),
-        "evening": (day_start.replace(hour=18), day_start.replace(hour=22), "увечері"),
-        "night": (day_start.replace(hour=22), day_start.replace(hour=23, minute=59), "у вечірньо-нічному проміжку"),
-    }
-    start_dt, end_dt, label = mapping.get(window, (day_start, day_start.replace(hour=23, minute=59), "протягом дня"))
+    start_time, end_time, label = _WINDOW_RANGES.get(window, _WHOLE_DAY_RANGE)
+    start_dt = day_start.replace(hour=start_time.hour, minute=start_time.minute)
+    end_dt = day_start.replace(hour=end_time.hour, minute=end_time.minute)
     return start_dt.astimezone(tz), end_dt.astimezone(tz), label
 
 
 def _extract_date_range(
     metadata: dict[str, Any],
-    text: str,
     now: datetime,
-    last_request: dict[str, Any] | None = None,
+    last_request: dict[str, Any] | None,
+    inferred_range: tuple[datetime | None, datetime | None],
 ) -> tuple[datetime, datetime]:
-    tz = now.tzinfo or ZoneInfo("UTC")
+    tz = now.tzinfo or _UTC
     start = _parse_iso_datetime(metadata.get("date_from"), tz)
     end = _parse_iso_datetime(metadata.get("date_to"), tz)
 
@@ -350,7 +426,7 @@ def _extract_date_range(
     if not end and last_request:
         end = _parse_iso_datetime(last_request.get("date_to"), tz)
 
-    inferred_start, inferred_end = _detect_range_from_text(text, now)
+    inferred_start, inferred_end = inferred_range
 
     start = start or inferred_start or now
     if not end:
@@ -370,23 +446,26 @@ def _parse_iso_datetime(value: Any, tz: ZoneInfo) -> datetime | None:
     if isinstance(value, datetime):
         return value if value.tzinfo else value.replace(tzinfo=tz)
     if isinstance(value, str):
-        try:
-            dt = datetime.fromisoformat(value)
-        except ValueError:
-            try:
-                dt = datetime.fromisoformat(f"{value}T00:00:00")
-            except ValueError:
-                return None
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=tz)
-        return dt
+        return _parse_iso_string(value, tz)
     return None
 
 
-def _detect_range_from_text(text: str, now: datetime) -> tuple[datetime | None, datetime | None]:
-    lower = text.lower()
-    tz = now.tzinfo or ZoneInfo("UTC")
+# Межі пошуку та історія курсора розбираються повторно при кожному "ще"/"раніше"
+@lru_cache(maxsize=1024)
+def _parse_iso_string(value: str, tz: ZoneInfo) -> datetime | None:
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            return datetime.combine(date.fromisoformat(value), time.min, tzinfo=tz)
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz)
+    return dt
+
 
+def _range_from_tags(tags: frozenset[str], now: datetime) -> tuple[datetime | None, datetime | None]:
     def day_start(dt: datetime) -> datetime:
         return dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
@@ -394,30 +473,20 @@ def _detect_range_from_text(text: str, now: datetime) -> tuple[datetime | None,
         return dt.replace(hour=23, minute=59, second=0, microsecond=0)
 
     start = end = None
-    if "сьогодні" in lower:
+    if "today" in tags:
         start = day_start(now)
         end = day_end(now)
-    if "завтра" in lower:
+    if "tomorrow" in tags:
         tomorrow = now + timedelta(days=1)
         start = day_start(tomorrow)
         end = day_end(tomorrow)
-    if "післязавтра" in lower:
+    if "day_after_tomorrow" in tags:
         day = now + timedelta(days=2)
         start = day_start(day)
         end = day_end(day)
 
-    weekdays = {
-        "понеділ": 0,
-        "вівтор": 1,
-        "серед": 2,
-        "четвер": 3,
-        "п'ятн": 4,
-        "пятн": 4,
-        "субот": 5,
-        "неділ": 6,
-    }
-    for word, target in weekdays.items():
-        if word in lower:
+    for target, tag in enumerate(_WEEKDAY_TAGS):
+        if tag in tags:
             day = _next_weekday(now, target)
             if not start:
                 start = day_start(day)
@@ -433,15 +502,14 @@ def _next_weekday(now: datetime, target: int) -> datetime:
     return now + timedelta(days=days_ahead)
 
 
-def _extract_custom_time_range(text: str, duration_minutes: int) -> tuple[int, int] | None:
-    lower = text.lower()
-    match = re.search(r"з\s*(\d{1,2})(?::(\d{2}))?\s*(?:до|по)\s*(\d{1,2})", lower)
+def _custom_time_range_from_lower(lower: str, duration_minutes: int) -> tuple[int, int] | None:
+    match = _TIME_RANGE_PATTERN.search(lower)
     if match:
         start_hour = int(match.group(1))
         end_hour = int(match.group(3))
         if 0 <= start_hour < 24 and 0 <= end_hour <= 24 and end_hour > start_hour:
             return start_hour, end_hour
-    match = re.search(r"з\s*(\d{1,2})(?::(\d{2}))?", lower)
+    match = _TIME_FROM_PATTERN.search(lower)
     if match:
         start_hour = int(match.group(1))
         if 0 <= start_hour < 24:
@@ -459,47 +527,43 @@ def _resolve_preferred_hours(
 ) -> tuple[int | None, int | None]:
     if explicit_range:
         return explicit_range
-    window_map = {
-        "morning": (6, 12),
-        "day": (12, 18),
-        "evening": (18, 22),
-        "night": (21, 24),
-    }
-    if preferred_window in window_map:
-        return window_map[preferred_window]
+    if preferred_window in _WINDOW_HOURS:
+        return _WINDOW_HOURS[preferred_window]
     return fallback_start, fallback_end
 
 
-def _extract_duration_minutes(metadata: dict[str, Any], text: str) -> int | None:
+def _duration_from_metadata(metadata: dict[str, Any]) -> int | None:
     duration = metadata.get("duration_minutes")
     if duration:
         try:
             return int(duration)
         except (TypeError, ValueError):
             pass
+    return None
 
-    lower = text.lower()
+
+def _duration_from_lower(lower: str) -> int | None:
     if "півтори" in lower or "полтора" in lower:
         return 90
-    match = re.search(r"(\d+)(?:\s*год|\s*h)", lower)
+    match = _HOURS_PATTERN.search(lower)
     if match:
         return int(match.group(1)) * 60
-    match = re.search(r"(\d+)(?:\s*хв|\s*min)", lower)
+    match = _MINUTES_PATTERN.search(lower)
     if match:
         return int(match.group(1))
-    word_map = {"одну": 60, "один": 60, "дві": 120, "две": 120, "три": 180}
-    for word, minutes in word_map.items():
-        if word in lower and "год" in lower:
+    if "год" not in lower:
+        return None
+    for word, minutes in _DURATION_WORDS.items():
+        if word in lower:
             return minutes
     return None
 
 
-def _detect_window_from_text(text: str) -> str | None:
-    lower = text.lower()
-    if any(word in lower for word in ("веч", "ніч")):
+def _window_from_tags(tags: frozenset[str]) -> str | None:
+    if "window_evening" in tags:
         return "evening"
-    if any(word in lower for word in ("ран", "утр")):
+    if "window_morning" in tags:
         return "morning"
-    if "день" in lower or "вдень" in lower:
+    if "window_day" in tags:
         return "day"
     return None
\ No newline at end of file
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, tzinfo
+from enum import IntEnum
+from functools import lru_cache
 import re
-from zoneinfo import ZoneInfo
+import time
+from types import MappingProxyType
+from typing import Mapping
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes, ConversationHandler
@@ -14,16 +19,112 @@ from app.services.habit_planner import HabitSetup
 
 logger = logging.getLogger(__name__)
 
+_preview_week_cache: tuple[int, tzinfo, datetime, datetime] | None = None
+
 (HABIT_NAME, HABIT_FREQUENCY, HABIT_DURATION, HABIT_PREFERRED_TIME) = range(4)
 
 
-def _habit_type_keyboard() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(
-        [
-            [InlineKeyboardButton("🕐 Фіксований час", callback_data="habit_type_fixed")],
-            [InlineKeyboardButton("🔄 Гнучкий розклад", callback_data="habit_type_flexible")],
-        ]
-    )
+class HabitState(IntEnum):
+    """Крок діалогу звички, що чекає на текстову відповідь користувача."""
+
+    IDLE = 0
+    FIXED_TIME = 1
+    RANGE = 2
+    NAME = 3
+    FREQUENCY = 4
+    DURATION = 5
+
+
+_HABIT_STATE_KEY = "habit_state"
+
+_TIME_RANGE_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?\s*$")
+_WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+_ANY_TIME_RANGES: Mapping[str, tuple[int, int]] = MappingProxyType(
+    {
+        "morning_any": (6, 12),
+        "day_any": (12, 18),
+        "evening_any": (18, 22),
+        "night_any": (22, 24),
+    }
+)
+_HABIT_KEYS = frozenset(
+    {
+        "habit_name",
+        "habit_frequency",
+        "habit_duration",
+        "habit_preference",
+        "habit_use_recurrence",
+        "habit_fixed_time",
+        "habit_time_of_day",
+        "habit_time_range",
+        "habit_selected_slots",
+        _HABIT_STATE_KEY,
+        "expecting_habit_time",
+        "expecting_habit_type",
+        "pending_habit",
+        "expecting_habit_timeofday",
+        "expecting_habit_confirmation",
+        "habit_flow_started",
+    }
+)
+
+# Клавіатури незмінні, тому створюємо їх один раз
+_HABIT_TYPE_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("🕐 Фіксований час", callback_data="habit_type_fixed")],
+        [InlineKeyboardButton("🔄 Гнучкий розклад", callback_data="habit_type_flexible")],
+    ]
+)
+_TIME_OF_DAY_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("Ранок (6:00-12:00)", callback_data="habit_tod_morning")],
+        [InlineKeyboardButton("День (12:00-18:00)", callback_data="habit_tod_day")],
+        [InlineKeyboardButton("Вечір (18:00-22:00)", callback_data="habit_tod_evening")],
+        [InlineKeyboardButton("Ніч (22:00-6:00)", callback_data="habit_tod_night")],
+    ]
+)
+_TIME_RANGE_KEYBOARDS: Mapping[str, InlineKeyboardMarkup] = MappingProxyType(
+    {
+        time_of_day: InlineKeyboardMarkup(
+            [[InlineKeyboardButton(label, callback_data=callback)] for label, callback in ranges]
+        )
+        for time_of_day, ranges in {
+            "morning": [
+                ("06:00-08:00", "habit_range_06-08"),
+                ("08:00-10:00", "habit_range_08-10"),
+                ("10:00-12:00", "habit_range_10-12"),
+                ("Будь-який ранковий", "habit_range_morning_any"),
+            ],
+            "day": [
+                ("12:00-14:00", "habit_range_12-14"),
+                ("14:00-16:00", "habit_range_14-16"),
+                ("16:00-18:00", "habit_range_16-18"),
+                ("Будь-який денний", "habit_range_day_any"),
+            ],
+            "evening": [
+                ("18:00-19:00", "habit_range_18-19"),
+                ("19:00-20:00", "habit_range_19-20"),
+                ("20:00-21:00", "habit_range_20-21"),
+                ("21:00-22:00", "habit_range_21-22"),
+                ("Будь-який вечірній", "habit_range_evening_any"),
+            ],
+            "night": [
+                ("22:00-00:00", "habit_range_22-24"),
+                ("00:00-02:00", "habit_range_00-02"),
+                ("02:00-06:00", "habit_range_02-06"),
+                ("Будь-який нічний", "habit_range_night_any"),
+            ],
+        }.items()
+    }
+)
+_EMPTY_KEYBOARD = InlineKeyboardMarkup([])
+_PREVIEW_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [InlineKeyboardButton("✅ Підтвердити", callback_data="habit_confirm")],
+        [InlineKeyboardButton("🔄 Змінити час", callback_data="habit_change_time")],
+        [InlineKeyboardButton("❌ Скасувати", callback_data="habit_cancel")],
+    ]
+)
 
 
 def _habit_type_prompt(frequency: int) -> str:
@@ -69,18 +170,19 @@ async def habit_set_frequency(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 
 async def habit_set_duration(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    user_data = context.user_data
     try:
         duration = int(update.message.text.strip())
     except ValueError:
         await update.message.reply_text("Введи тривалість у хвилинах, наприклад 45.")
         return HABIT_DURATION
-    context.user_data["habit_duration"] = max(10, min(duration, 240))
-    context.user_data["expecting_habit_type"] = True
+    user_data["habit_duration"] = max(10, min(duration, 240))
+    user_data["expecting_habit_type"] = True
 
-    freq = context.user_data.get("habit_frequency", 0)
+    freq = user_data.get("habit_frequency", 0)
     await update.message.reply_text(
         _habit_type_prompt(freq),
-        reply_markup=_habit_type_keyboard(),
+        reply_markup=_HABIT_TYPE_KEYBOARD,
     )
     return ConversationHandler.END
 
@@ -98,162 +200,154 @@ async def handle_habit_button_callback(update: Update, context: ContextTypes.DEF
     services = get_services(context)
     telegram_id = query.from_user.id
 
-    if query.data == "habit_type_fixed":
-        context.user_data["habit_use_recurrence"] = True
-        context.user_data.pop("expecting_habit_type", None)
-        context.user_data["expecting_fixed_time"] = True
-        await query.edit_message_text(
-            "О котрій годині хочеш займатися?\n"
-            "Введи час у форматі HH:MM (наприклад, 07:00 або 19:30)"
-        )
-        return
+    handler = _EXACT_CALLBACKS.get(query.data)
+    if handler is None:
+        if query.data.startswith("habit_tod_"):
+            handler = _handle_time_of_day
+        elif query.data.startswith("habit_range_"):
+            handler = _handle_time_range
+        else:
+            return
+    await handler(query, context, services, telegram_id)
 
-    if query.data == "habit_type_flexible":
-        context.user_data["habit_use_recurrence"] = False
-        context.user_data.pop("expecting_habit_type", None)
-        context.user_data["expecting_habit_timeofday"] = True
-
-        buttons = [
-            [InlineKeyboardButton("Ранок (6:00-12:00)", callback_data="habit_tod_morning")],
-            [InlineKeyboardButton("День (12:00-18:00)", callback_data="habit_tod_day")],
-            [InlineKeyboardButton("Вечір (18:00-22:00)", callback_data="habit_tod_evening")],
-            [InlineKeyboardButton("Ніч (22:00-6:00)", callback_data="habit_tod_night")],
-        ]
-        await query.edit_message_text(
-            "Який час доби найкращий?",
-            reply_markup=InlineKeyboardMarkup(buttons),
-        )
-        return
 
-    if query.data.startswith("habit_tod_"):
-        time_of_day = query.data.replace("habit_tod_", "")
-        context.user_data["habit_time_of_day"] = time_of_day
-        context.user_data.pop("expecting_habit_timeofday", None)
-        context.user_data["expecting_habit_timerange"] = True
+async def _ask_time_of_day(query, context: ContextTypes.DEFAULT_TYPE, text: str) -> None:
+    context.user_data["expecting_habit_timeofday"] = True
+    await query.edit_message_text(text, reply_markup=_TIME_OF_DAY_KEYBOARD)
 
-        time_ranges = {
-            "morning": [
-                ("06:00-08:00", "habit_range_06-08"),
-                ("08:00-10:00", "habit_range_08-10"),
-                ("10:00-12:00", "habit_range_10-12"),
-                ("Будь-який ранковий", "habit_range_morning_any"),
-            ],
-            "day": [
-                ("12:00-14:00", "habit_range_12-14"),
-                ("14:00-16:00", "habit_range_14-16"),
-                ("16:00-18:00", "habit_range_16-18"),
-                ("Будь-який денний", "habit_range_day_any"),
-            ],
-            "evening": [
-                ("18:00-19:00", "habit_range_18-19"),
-                ("19:00-20:00", "habit_range_19-20"),
-                ("20:00-21:00", "habit_range_20-21"),
-                ("21:00-22:00", "habit_range_21-22"),
-                ("Будь-який вечірній", "habit_range_evening_any"),
-            ],
-            "night": [
-                ("22:00-00:00", "habit_range_22-24"),
-                ("00:00-02:00", "habit_range_00-02"),
-                ("02:00-06:00", "habit_range_02-06"),
-                ("Будь-який нічний", "habit_range_night_any"),
-            ],
-        }
 
-        buttons = [[InlineKeyboardButton(label, callback_data=cb)] for label, cb in time_ranges.get(time_of_day, [])]
+async def _handle_fixed(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    user_data = context.user_data
+    user_data["habit_use_recurrence"] = True
+    user_data.pop("expecting_habit_type", None)
+    user_data[_HABIT_STATE_KEY] = HabitState.FIXED_TIME
+    await query.edit_message_text(
+        "О котрій годині хочеш займатися?\n"
+        "Введи час у форматі HH:MM (наприклад, 07:00 або 19:30)"
+    )
 
-        await query.edit_message_text(
-            "Обери зручний діапазон часу або введи свій у форматі HH:MM-HH:MM (наприклад, 19:00-20:00):",
-            reply_markup=InlineKeyboardMarkup(buttons),
-        )
-        return
 
-    if query.data.startswith("habit_range_"):
-        range_str = query.data.replace("habit_range_", "")
-        context.user_data["habit_time_range"] = range_str
-        context.user_data.pop("expecting_habit_timerange", None)
-
-        await query.edit_message_text("🔍 Шукаю вільні вікна...")
-        await _show_habit_preview(
-            context,
-            services,
-            telegram_id,
-            lambda text, markup: query.edit_message_text(text, reply_markup=markup),
-        )
-        return
+async def _handle_flexible(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    context.user_data["habit_use_recurrence"] = False
+    context.user_data.pop("expecting_habit_type", None)
+    await _ask_time_of_day(query, context, "Який час доби найкращий?")
+
+
+async def _handle_time_of_day(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    user_data = context.user_data
+    time_of_day = query.data.replace("habit_tod_", "")
+    user_data["habit_time_of_day"] = time_of_day
+    user_data.pop("expecting_habit_timeofday", None)
+    user_data[_HABIT_STATE_KEY] = HabitState.RANGE
+
+    await query.edit_message_text(
+        "Обери зручний діапазон часу або введи свій у форматі HH:MM-HH:MM (наприклад, 19:00-20:00):",
+        reply_markup=_TIME_RANGE_KEYBOARDS.get(time_of_day, _EMPTY_KEYBOARD),
+    )
 
-    if query.data == "habit_confirm":
-        context.user_data.pop("expecting_habit_confirmation", None)
-        await query.edit_message_text("⏳ Створюю події в календарі...")
-
-        selected_slots = context.user_data.get("habit_selected_slots")
-        if selected_slots:
-            try:
-                habit_name = context.user_data.get("habit_name", "Звичка")
-                created_count = 0
-                created_summary: list[str] = []
-                for start_str, end_str in selected_slots:
-                    start_dt = datetime.fromisoformat(start_str)
-                    end_dt = datetime.fromisoformat(end_str)
-                    created_event = await services.calendar.create_event(
+
+async def _handle_time_range(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    range_str = query.data.replace("habit_range_", "")
+    context.user_data["habit_time_range"] = range_str
+    context.user_data.pop(_HABIT_STATE_KEY, None)
+
+    await query.edit_message_text("🔍 Шукаю вільні вікна...")
+    await _show_habit_preview(
+        context,
+        services,
+        telegram_id,
+        lambda text, markup: query.edit_message_text(text, reply_markup=markup),
+    )
+
+
+async def _handle_confirm(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    user_data = context.user_data
+    user_data.pop("expecting_habit_confirmation", None)
+    await query.edit_message_text("⏳ Створюю події в календарі...")
+
+    selected_slots = user_data.get("habit_selected_slots")
+    if selected_slots:
+        try:
+            habit_name = user_data.get("habit_name", "Звичка")
+            tz_name = services.settings.timezone
+            await services.calendar.prepare_credentials(telegram_id)
+            # Сесії незалежні, тому створюємо їх паралельно, а помилку однієї не губимо
+            results = await asyncio.gather(
+                *(
+                    services.calendar.create_event(
                         telegram_id,
                         summary=habit_name,
-                        start={"dateTime": start_dt.isoformat(), "timeZone": services.settings.timezone},
-                        end={"dateTime": end_dt.isoformat(), "timeZone": services.settings.timezone},
+                        start={"dateTime": start_dt.isoformat(), "timeZone": tz_name},
+                        end={"dateTime": end_dt.isoformat(), "timeZone": tz_name},
                         description="Сесія звички",
                     )
-                    created_count += 1
-                    link = created_event.html_link
-                    created_summary.append(
-                        f"• {start_dt:%a %d.%m %H:%M} → {end_dt:%H:%M}"
-                        + (f" ({link})" if link else "")
-                    )
-                summary_text = [
-                    f"✅ Створено {created_count} сесій звички \"{habit_name}\".",
-                    "Події додано у Google Calendar:",
-                    *created_summary,
-                ]
-                await query.edit_message_text("\n".join(summary_text))
-            except Exception as exc:  # pragma: no cover
-                logger.exception("Помилка при створенні звички: %s", exc)
-                await query.edit_message_text(f"Не вдалося створити звичку: {exc}")
-        else:
-            setup = HabitSetup(
-                name=context.user_data.get("habit_name", "Звичка"),
-                duration_minutes=context.user_data.get("habit_duration", 30),
-                preferred_time_of_day=context.user_data.get("habit_preference"),
-                target_sessions_per_week=context.user_data.get("habit_frequency", 3),
-                use_recurrence=context.user_data.get("habit_use_recurrence", False),
-                fixed_time=context.user_data.get("habit_fixed_time"),
+                    for start_dt, end_dt in selected_slots
+                ),
+                return_exceptions=True,
             )
-            try:
-                summary = await services.habit_planner.setup_habit(telegram_id, setup)
-                await query.edit_message_text(summary)
-            except Exception as exc:  # pragma: no cover
-                logger.exception("Помилка при створенні звички: %s", exc)
-                await query.edit_message_text(f"Не вдалося створити звичку: {exc}")
-
-        _clear_habit_context(context)
-        return
-
-    if query.data == "habit_change_time":
-        context.user_data["expecting_habit_timeofday"] = True
-        context.user_data.pop("habit_time_range", None)
-        buttons = [
-            [InlineKeyboardButton("Ранок (6:00-12:00)", callback_data="habit_tod_morning")],
-            [InlineKeyboardButton("День (12:00-18:00)", callback_data="habit_tod_day")],
-            [InlineKeyboardButton("Вечір (18:00-22:00)", callback_data="habit_tod_evening")],
-            [InlineKeyboardButton("Ніч (22:00-6:00)", callback_data="habit_tod_night")],
-        ]
-        await query.edit_message_text(
-            "Обери інший час доби:",
-            reply_markup=InlineKeyboardMarkup(buttons),
+            created_summary: list[str] = []
+            errors: list[BaseException] = []
+            for (start_dt, end_dt), created_event in zip(selected_slots, results):
+                if isinstance(created_event, BaseException):
+                    logger.error("Не вдалося створити сесію звички: %s", created_event)
+                    errors.append(created_event)
+                    continue
+                link = created_event.html_link
+                created_summary.append(
+                    f"• {start_dt:%a %d.%m %H:%M} → {end_dt:%H:%M}"
+                    + (f" ({link})" if link else "")
+                )
+            if not created_summary:
+                raise errors[0]
+            summary_text = [
+                f"✅ Створено {len(created_summary)} сесій звички \"{habit_name}\".",
+                "Події додано у Google Calendar:",
+                *created_summary,
+            ]
+            if errors:
+                summary_text.append(f"⚠️ Не вдалося створити {len(errors)} сесій, спробуй додати їх пізніше.")
+            await query.edit_message_text("\n".join(summary_text))
+        except Exception as exc:  # pragma: no cover
+            logger.exception("Помилка при створенні звички: %s", exc)
+            await query.edit_message_text(f"Не вдалося створити звичку: {exc}")
+    else:
+        setup = HabitSetup(
+            name=user_data.get("habit_name", "Звичка"),
+            duration_minutes=user_data.get("habit_duration", 30),
+            preferred_time_of_day=user_data.get("habit_preference"),
+            target_sessions_per_week=user_data.get("habit_frequency", 3),
+            use_recurrence=user_data.get("habit_use_recurrence", False),
+            fixed_time=user_data.get("habit_fixed_time"),
         )
-        return
+        try:
+            summary = await services.habit_planner.setup_habit(telegram_id, setup)
+            await query.edit_message_text(summary)
+        except Exception as exc:  # pragma: no cover
+            logger.exception("Помилка при створенні звички: %s", exc)
+            await query.edit_message_text(f"Не вдалося створити звичку: {exc}")
+
+    _clear_habit_context(context)
+
+
+async def _handle_change_time(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    context.user_data.pop("habit_time_range", None)
+    await _ask_time_of_day(query, context, "Обери інший час доби:")
+
+
+async def _handle_cancel(query, context: ContextTypes.DEFAULT_TYPE, services, telegram_id: int) -> None:
+    await query.edit_message_text("Налаштування звички скасовано.")
+    _clear_habit_context(context)
 
-    if query.data == "habit_cancel":
-        await query.edit_message_text("Налаштування звички скасовано.")
-        _clear_habit_context(context)
-        return
+
+_EXACT_CALLBACKS = MappingProxyType(
+    {
+        "habit_type_fixed": _handle_fixed,
+        "habit_type_flexible": _handle_flexible,
+        "habit_confirm": _handle_confirm,
+        "habit_change_time": _handle_change_time,
+        "habit_cancel": _handle_cancel,
+    }
+)
 
 
 async def handle_habit_shortcut(
@@ -263,7 +357,7 @@ async def handle_habit_shortcut(
 ) -> bool:
     telegram_id = update.effective_user.id
 
-    context.user_data["expecting_habit_name"] = True
+    context.user_data[_HABIT_STATE_KEY] = HabitState.NAME
     await update.effective_message.reply_text(
         "Опиши, яку звичку хочеш впровадити. Наприклад: 'Ранкова йога' або 'Читання книги'."
     )
@@ -276,99 +370,143 @@ async def process_habit_state_message(
     services,
     text: str,
 ) -> bool:
-    message = update.effective_message
-    telegram_id = update.effective_user.id
-    stripped = (text or "").strip()
-
-    if context.user_data.pop("expecting_fixed_time", False):
-        time_match = re.match(r"^(\d{1,2}):(\d{2})$", stripped)
-        if not time_match:
-            context.user_data["expecting_fixed_time"] = True
-            await message.reply_text(
-                "Неправильний формат. Введи час у форматі HH:MM\nНаприклад: 07:00 або 19:30"
-            )
-            return True
+    # Крок діалогу зберігається одним значенням, тому не перебираємо прапорці expecting_*
+    handler = _STATE_HANDLERS.get(context.user_data.get(_HABIT_STATE_KEY, HabitState.IDLE))
+    if handler is None:
+        return False
+    await handler(update.effective_message, context, services, update.effective_user.id, (text or "").strip())
+    return True
 
-        hour, minute = int(time_match.group(1)), int(time_match.group(2))
-        if not (0 <= hour < 24 and 0 <= minute < 60):
-            context.user_data["expecting_fixed_time"] = True
-            await message.reply_text(
-                "Неправильний час. Години: 0-23, хвилини: 0-59\nНаприклад: 07:00 або 19:30"
-            )
-            return True
 
-        context.user_data["habit_fixed_time"] = f"{hour:02d}:{minute:02d}"
-        setup = HabitSetup(
-            name=context.user_data.get("habit_name", "Звичка"),
-            duration_minutes=context.user_data.get("habit_duration", 30),
-            preferred_time_of_day=None,
-            target_sessions_per_week=context.user_data.get("habit_frequency", 7),
-            use_recurrence=True,
-            fixed_time=context.user_data["habit_fixed_time"],
+async def _handle_fixed_time_message(
+    message,
+    context: ContextTypes.DEFAULT_TYPE,
+    services,
+    telegram_id: int,
+    stripped: str,
+) -> None:
+    user_data = context.user_data
+    fixed_time = _parse_fixed_time(stripped)
+    if fixed_time is None:
+        await message.reply_text(
+            "Неправильний формат. Введи час у форматі HH:MM\nНаприклад: 07:00 або 19:30"
         )
-        try:
-            summary = await services.habit_planner.setup_habit(telegram_id, setup)
-            await message.reply_text(summary)
-        except Exception as exc:  # pragma: no cover
-            logger.exception("Помилка при створенні звички: %s", exc)
-            await message.reply_text(f"Не вдалося створити звичку: {exc}")
-        _clear_habit_context(context)
-        return True
-
-    if context.user_data.get("expecting_habit_timerange"):
-        manual_match = re.match(r"^\s*(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?\s*$", stripped)
-        if not manual_match:
-            await message.reply_text("Введи діапазон у форматі HH:MM-HH:MM, наприклад 19:00-20:00.")
-            return True
-        start_hour = int(manual_match.group(1))
-        end_hour = int(manual_match.group(3))
-        if not (0 <= start_hour < 24 and 0 < end_hour <= 24 and end_hour > start_hour):
-            await message.reply_text("Діапазон має бути в межах 00-24 і кінець повинен бути пізніше початку.")
-            return True
-        context.user_data["habit_time_range"] = f"{start_hour:02d}-{end_hour:02d}"
-        context.user_data.pop("expecting_habit_timerange", None)
-        await message.reply_text("🔍 Шукаю вільні вікна...")
-        await _show_habit_preview(
-            context,
-            services,
-            telegram_id,
-            lambda text, markup: message.reply_text(text, reply_markup=markup),
+        return
+
+    hour, minute = fixed_time
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        await message.reply_text(
+            "Неправильний час. Години: 0-23, хвилини: 0-59\nНаприклад: 07:00 або 19:30"
         )
-        return True
+        return
 
-    if context.user_data.pop("expecting_habit_name", False):
-        context.user_data["habit_name"] = stripped
-        context.user_data["expecting_habit_frequency"] = True
-        await message.reply_text("Скільки разів на тиждень плануєш займатися? Введи число, наприклад 3.")
-        return True
+    user_data.pop(_HABIT_STATE_KEY, None)
+    fixed_time_str = user_data["habit_fixed_time"] = f"{hour:02d}:{minute:02d}"
+    setup = HabitSetup(
+        name=user_data.get("habit_name", "Звичка"),
+        duration_minutes=user_data.get("habit_duration", 30),
+        preferred_time_of_day=None,
+        target_sessions_per_week=user_data.get("habit_frequency", 7),
+        use_recurrence=True,
+        fixed_time=fixed_time_str,
+    )
+    try:
+        summary = await services.habit_planner.setup_habit(telegram_id, setup)
+        await message.reply_text(summary)
+    except Exception as exc:  # pragma: no cover
+        logger.exception("Помилка при створенні звички: %s", exc)
+        await message.reply_text(f"Не вдалося створити звичку: {exc}")
+    _clear_habit_context(context)
 
-    if context.user_data.pop("expecting_habit_frequency", False):
-        try:
-            freq = int(stripped)
-            context.user_data["habit_frequency"] = max(1, min(freq, 14))
-            context.user_data["expecting_habit_duration"] = True
-            await message.reply_text("Яка тривалість однієї сесії у хвилинах? Наприклад, 30.")
-        except ValueError:
-            context.user_data["expecting_habit_frequency"] = True
-            await message.reply_text("Будь ласка, введи число (кількість сесій на тиждень).")
-        return True
 
-    if context.user_data.pop("expecting_habit_duration", False):
-        try:
-            duration = int(stripped)
-            context.user_data["habit_duration"] = max(10, min(duration, 240))
-            freq = context.user_data.get("habit_frequency", 0)
-            context.user_data["expecting_habit_type"] = True
-            await message.reply_text(
-                _habit_type_prompt(freq),
-                reply_markup=_habit_type_keyboard(),
-            )
-        except ValueError:
-            context.user_data["expecting_habit_duration"] = True
-            await message.reply_text("Введи тривалість у хвилинах, наприклад 45.")
-        return True
+async def _handle_time_range_message(
+    message,
+    context: ContextTypes.DEFAULT_TYPE,
+    services,
+    telegram_id: int,
+    stripped: str,
+) -> None:
+    manual_match = _TIME_RANGE_PATTERN.match(stripped)
+    if not manual_match:
+        await message.reply_text("Введи діапазон у форматі HH:MM-HH:MM, наприклад 19:00-20:00.")
+        return
+    start_hour = int(manual_match.group(1))
+    end_hour = int(manual_match.group(3))
+    if not (0 <= start_hour < 24 and 0 < end_hour <= 24 and end_hour > start_hour):
+        await message.reply_text("Діапазон має бути в межах 00-24 і кінець повинен бути пізніше початку.")
+        return
+    context.user_data["habit_time_range"] = f"{start_hour:02d}-{end_hour:02d}"
+    context.user_data.pop(_HABIT_STATE_KEY, None)
+    await message.reply_text("🔍 Шукаю вільні вікна...")
+    await _show_habit_preview(
+        context,
+        services,
+        telegram_id,
+        lambda text, markup: message.reply_text(text, reply_markup=markup),
+    )
 
-    return False
+
+async def _handle_name_message(
+    message,
+    context: ContextTypes.DEFAULT_TYPE,
+    services,
+    telegram_id: int,
+    stripped: str,
+) -> None:
+    context.user_data["habit_name"] = stripped
+    context.user_data[_HABIT_STATE_KEY] = HabitState.FREQUENCY
+    await message.reply_text("Скільки разів на тиждень плануєш займатися? Введи число, наприклад 3.")
+
+
+async def _handle_frequency_message(
+    message,
+    context: ContextTypes.DEFAULT_TYPE,
+    services,
+    telegram_id: int,
+    stripped: str,
+) -> None:
+    try:
+        freq = int(stripped)
+    except ValueError:
+        await message.reply_text("Будь ласка, введи число (кількість сесій на тиждень).")
+        return
+    context.user_data["habit_frequency"] = max(1, min(freq, 14))
+    context.user_data[_HABIT_STATE_KEY] = HabitState.DURATION
+    await message.reply_text("Яка тривалість однієї сесії у хвилинах? Наприклад, 30.")
+
+
+async def _handle_duration_message(
+    message,
+    context: ContextTypes.DEFAULT_TYPE,
+    services,
+    telegram_id: int,
+    stripped: str,
+) -> None:
+    user_data = context.user_data
+    try:
+        duration = int(stripped)
+    except ValueError:
+        await message.reply_text("Введи тривалість у хвилинах, наприклад 45.")
+        return
+    user_data["habit_duration"] = max(10, min(duration, 240))
+    user_data.pop(_HABIT_STATE_KEY, None)
+    freq = user_data.get("habit_frequency", 0)
+    user_data["expecting_habit_type"] = True
+    await message.reply_text(
+        _habit_type_prompt(freq),
+        reply_markup=_HABIT_TYPE_KEYBOARD,
+    )
+
+
+_STATE_HANDLERS = MappingProxyType(
+    {
+        HabitState.FIXED_TIME: _handle_fixed_time_message,
+        HabitState.RANGE: _handle_time_range_message,
+        HabitState.NAME: _handle_name_message,
+        HabitState.FREQUENCY: _handle_frequency_message,
+        HabitState.DURATION: _handle_duration_message,
+    }
+)
 
 
 async def _generate_habit_preview(
@@ -376,17 +514,15 @@ async def _generate_habit_preview(
     context: ContextTypes.DEFAULT_TYPE,
     services,
 ) -> str:
-    habit_name = context.user_data.get("habit_name", "Звичка")
-    duration = context.user_data.get("habit_duration", 30)
-    frequency = context.user_data.get("habit_frequency", 3)
-    time_range = context.user_data.get("habit_time_range", "")
+    user_data = context.user_data
+    habit_name = user_data.get("habit_name", "Звичка")
+    duration = user_data.get("habit_duration", 30)
+    frequency = user_data.get("habit_frequency", 3)
+    time_range = user_data.get("habit_time_range", "")
 
     start_hour, end_hour = _parse_time_range(time_range)
 
-    tz = ZoneInfo(services.settings.timezone)
-    now = datetime.now(tz)
-    week_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_end = week_start + timedelta(days=7)
+    week_start, week_end = _preview_week(services.settings.tzinfo)
 
     request = FreeSlotRequest(
         telegram_id=telegram_id,
@@ -397,29 +533,34 @@ async def _generate_habit_preview(
         preferred_end=end_hour,
     )
 
-    slots = await services.free_slot_service.find_slots(request, max_suggestions=frequency * 2)
-    if not slots:
+    # Пошук жадібний і йде по днях, тож зайві кандидати понад frequency однаково відкидалися
+    selected_slots = await services.calendar.free_slot_cache.get_or_fetch(
+        telegram_id,
+        week_start,
+        week_end,
+        lambda: services.free_slot_service.find_slots(request, max_suggestions=frequency),
+        variant=(duration, frequency, start_hour, end_hour),
+    )
+    if not selected_slots:
         raise RuntimeError("Не знайдено вільних вікон у вказаному діапазоні. Спробуй інший час.")
 
-    selected_slots = slots[:frequency]
-    context.user_data["habit_selected_slots"] = [
-        (slot.start.isoformat(), slot.end.isoformat()) for slot in selected_slots
-    ]
+    user_data["habit_selected_slots"] = [(slot.start, slot.end) for slot in selected_slots]
 
     tz_label = services.settings.timezone
-    lines = [f"📋 Попередній розклад для \"{habit_name}\":\n"]
-    weekdays = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
-    for slot in selected_slots:
-        weekday = weekdays[slot.start.weekday()]
-        date_str = slot.start.strftime("%d.%m")
-        start_str = slot.start.strftime("%H:%M")
-        end_str = slot.end.strftime("%H:%M")
-        lines.append(f"• {weekday} {date_str} — {start_str} → {end_str} ({tz_label})")
-
-    lines.append(f"\n⏱️ Тривалість: {duration} хв")
-    lines.append(f"🔁 Частота: {frequency} разів/тиждень")
-    lines.append("Можеш підтвердити, змінити діапазон або скасувати нижче.")
-    return "\n".join(lines)
+    slot_lines = [
+        f"• {_WEEKDAYS[slot.start.weekday()]} {slot.start.day:02d}.{slot.start.month:02d} — "
+        f"{slot.start.hour:02d}:{slot.start.minute:02d} → {slot.end.hour:02d}:{slot.end.minute:02d} ({tz_label})"
+        for slot in selected_slots
+    ]
+    return "\n".join(
+        (
+            f"📋 Попередній розклад для \"{habit_name}\":\n",
+            *slot_lines,
+            f"\n⏱️ Тривалість: {duration} хв",
+            f"🔁 Частота: {frequency} разів/тиждень",
+            "Можеш підтвердити, змінити діапазон або скасувати нижче.",
+        )
+    )
 
 
 async def _show_habit_preview(
@@ -430,12 +571,7 @@ async def _show_habit_preview(
 ) -> None:
     try:
         preview_text = await _generate_habit_preview(telegram_id, context, services)
-        buttons = [
-            [InlineKeyboardButton("✅ Підтвердити", callback_data="habit_confirm")],
-            [InlineKeyboardButton("🔄 Змінити час", callback_data="habit_change_time")],
-            [InlineKeyboardButton("❌ Скасувати", callback_data="habit_cancel")],
-        ]
-        await send_func(preview_text, InlineKeyboardMarkup(buttons))
+        await send_func(preview_text, _PREVIEW_KEYBOARD)
         context.user_data["expecting_habit_confirmation"] = True
     except Exception as exc:  # pragma: no cover
         logger.exception("Помилка при пошуку слотів звички: %s", exc)
@@ -445,6 +581,30 @@ async def _show_habit_preview(
         )
 
 
+def _parse_fixed_time(text: str) -> tuple[int, int] | None:
+    hour_str, sep, minute_str = text.partition(":")
+    if not sep or not (1 <= len(hour_str) <= 2 and len(minute_str) == 2):
+        return None
+    if not (hour_str.isdecimal() and minute_str.isdecimal()):
+        return None
+    return int(hour_str), int(minute_str)
+
+
+def _preview_week(tz: tzinfo) -> tuple[datetime, datetime]:
+    # Межі тижня змінюються лише опівночі, тож запити в межах однієї секунди їх перевикористовують
+    global _preview_week_cache
+    second = int(time.time())
+    cached = _preview_week_cache
+    if cached is not None and cached[0] == second and cached[1] is tz:
+        return cached[2], cached[3]
+    week_start = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    week_end = week_start + timedelta(days=7)
+    _preview_week_cache = (second, tz, week_start, week_end)
+    return week_start, week_end
+
+
+# Діапазони приходять з фіксованого набору кнопок, тому результат розбору кешуємо
+@lru_cache(maxsize=64)
 def _parse_time_range(range_str: str) -> tuple[int, int]:
     if "-" in range_str:
         start_str, end_str = range_str.split("-")
@@ -452,38 +612,13 @@ def _parse_time_range(range_str: str) -> tuple[int, int]:
             return int(start_str), int(end_str)
         except ValueError:
             pass
-    mapping = {
-        "morning_any": (6, 12),
-        "day_any": (12, 18),
-        "evening_any": (18, 22),
-        "night_any": (22, 24),
-    }
-    return mapping.get(range_str, (6, 22))
+    return _ANY_TIME_RANGES.get(range_str, (6, 22))
 
 
 def _clear_habit_context(context: ContextTypes.DEFAULT_TYPE) -> None:
-    for key in [
-        "habit_name",
-        "habit_frequency",
-        "habit_duration",
-        "habit_preference",
-        "habit_use_recurrence",
-        "habit_fixed_time",
-        "habit_time_of_day",
-        "habit_time_range",
-        "habit_selected_slots",
-        "expecting_habit_name",
-        "expecting_habit_frequency",
-        "expecting_habit_duration",
-        "expecting_habit_time",
-        "expecting_habit_type",
-        "pending_habit",
-        "expecting_habit_timeofday",
-        "expecting_habit_timerange",
-        "expecting_habit_confirmation",
-        "habit_flow_started",
-    ]:
-        context.user_data.pop(key, None)
+    user_data = context.user_data
+    for key in _HABIT_KEYS & user_data.keys():
+        del user_data[key]
 
 
 __all__ = [
@@ -16,6 +16,7 @@ from app.bot.context import (
     PendingUpdateDetail,
     PendingUpdateListContext,
     ServiceContainer,
+    clear_free_slot_expectation,
     get_last_event_context,
     get_last_event_query,
     get_last_free_slots,
@@ -40,11 +41,11 @@ from app.bot.context import (
 )
 from app.bot.analytics import handle_analytics_intent
 from app.bot.events import (
-    _append_event_details,
+    _EVENT_SEPARATOR,
+    _append_event_row,
     apply_update_from_pending_conflict,
     create_event_from_pending,
     event_reminder_label,
-    format_iso_datetime,
     handle_agenda,
     handle_agenda_button,
     handle_create_event,
@@ -291,19 +292,10 @@ async def list_events(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
 
     lines = ["Найближчі події:"]
-    total = len(events)
     for idx, item in enumerate(events):
-        start_str = format_iso_datetime(item.start)
-        end_str = format_iso_datetime(item.end)
-        summary = item.summary
-        link = item.html_link
-        if link:
-            lines.append(f"• {summary} — {start_str} → {end_str} ({link})")
-        else:
-            lines.append(f"• {summary} — {start_str} → {end_str}")
-        _append_event_details(lines, item)
-        if idx < total - 1:
-            lines.append("────────────────────")
+        if idx:
+            lines.append(_EVENT_SEPARATOR)
+        _append_event_row(lines, item)
     await update.message.reply_text("\n".join(lines))
 
     first_event = events[0]
@@ -342,7 +334,7 @@ async def fallback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     meet_remove_requested = text_requests_remove_meet(text)
     meet_command_detected = meet_add_requested or meet_remove_requested
     if meet_command_detected:
-        context.user_data.pop(FREE_SLOT_EXPECTATION_KEY, None)
+        clear_free_slot_expectation(context)
     
     pending_update_detail = get_pending_update_detail(context)
     if pending_update_detail:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import io
 import logging
+from collections import defaultdict
 from datetime import datetime
 from typing import Any
 
@@ -10,7 +11,13 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from app.services.analytics import AnalyticsSnapshot, CategoryStat
+from app.services.analytics import (
+    AnalyticsSnapshot,
+    CategoryStat,
+    EventInterval,
+    build_day_totals,
+    event_intervals,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,29 +77,13 @@ def generate_pie_chart(category_stats: list[CategoryStat]) -> io.BytesIO | None:
     return buf
 
 
-def generate_heatmap(events: list[Any], days: int = 7) -> io.BytesIO | None:
-    from app.services.analytics import _extract_datetime
-
-    heatmap_data: dict[tuple[int, int], float] = {}
+def generate_heatmap(intervals: list[EventInterval], days: int = 7) -> io.BytesIO | None:
+    heatmap_data: defaultdict[tuple[int, int], float] = defaultdict(float)
 
     day_names_uk = ["Пн", "Вв", "Ср", "Чт", "Пт", "Сб", "Нд"]
 
-    for event in events:
-        if hasattr(event, 'start'):
-            start_payload = event.start
-            end_payload = event.end
-        else:
-            start_payload = event.get("start")
-            end_payload = event.get("end")
-        
-        start_dt = _extract_datetime(start_payload)
-        end_dt = _extract_datetime(end_payload)
-        if not start_dt or not end_dt:
-            continue
-
+    for start_dt, end_dt in intervals:
         duration_hours = (end_dt - start_dt).total_seconds() / 3600
-        if duration_hours <= 0:
-            continue
 
         day_of_week = start_dt.weekday()
         start_hour = start_dt.hour
@@ -102,8 +93,7 @@ def generate_heatmap(events: list[Any], days: int = 7) -> io.BytesIO | None:
 
         while remaining_duration > 0 and current_hour < 24:
             hour_duration = min(1.0, remaining_duration)
-            key = (day_of_week, current_hour)
-            heatmap_data[key] = heatmap_data.get(key, 0.0) + hour_duration
+            heatmap_data[(day_of_week, current_hour)] += hour_duration
             remaining_duration -= hour_duration
             current_hour += 1
 
@@ -188,8 +178,6 @@ def generate_daily_bar_chart(day_totals: dict[str, float]) -> io.BytesIO | None:
 
 
 def generate_all_charts(snapshot: AnalyticsSnapshot, events: list[Any] | None = None) -> list[tuple[str, io.BytesIO]]:
-    from app.services.analytics import _extract_datetime
-
     charts = []
 
     if snapshot.category_stats:
@@ -198,31 +186,12 @@ def generate_all_charts(snapshot: AnalyticsSnapshot, events: list[Any] | None =
             charts.append(("Розподіл по категоріях", pie_chart))
 
     if events:
-        heatmap = generate_heatmap(events, days=snapshot.days)
+        intervals = event_intervals(events)
+        heatmap = generate_heatmap(intervals, days=snapshot.days)
         if heatmap:
             charts.append(("Теплова карта продуктивності", heatmap))
 
-        day_totals: dict[str, float] = {}
-        for event in events:
-            if hasattr(event, 'start'):
-                start_payload = event.start
-                end_payload = event.end
-            else:
-                start_payload = event.get("start")
-                end_payload = event.get("end")
-            
-            start_dt = _extract_datetime(start_payload)
-            end_dt = _extract_datetime(end_payload)
-            if not start_dt or not end_dt:
-                continue
-
-            duration = (end_dt - start_dt).total_seconds() / 60
-            if duration <= 0:
-                continue
-
-            day_key = start_dt.strftime("%a %d.%m")
-            day_totals[day_key] = day_totals.get(day_key, 0.0) + duration / 60
-
+        day_totals = snapshot.day_totals or build_day_totals(intervals)
         if day_totals:
             bar_chart = generate_daily_bar_chart(day_totals)
             if bar_chart:
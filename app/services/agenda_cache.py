@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+AGENDA_CACHE_TTL_SECONDS = 30.0
+
+AgendaKey = tuple[int, datetime, datetime, Hashable]
+
+_T = TypeVar("_T")
+
+
+class AgendaCache(Generic[_T]):
+    """Короткоживучий кеш списків подій для повторних запитів розкладу."""
+
+    def __init__(self, ttl_seconds: float = AGENDA_CACHE_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[AgendaKey, tuple[float, list[_T]]] = {}
+        self._locks: dict[AgendaKey, asyncio.Lock] = {}
+        self._lock_users: dict[AgendaKey, int] = {}
+        self._versions: dict[int, int] = {}
+
+    async def get_or_fetch(
+        self,
+        telegram_id: int,
+        start: datetime,
+        end: datetime,
+        fetch: Callable[[], Awaitable[list[_T]]],
+        *,
+        variant: Hashable = None,
+    ) -> list[_T]:
+        key = (telegram_id, start, end, variant)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        # Однакові запити, що прийшли одночасно, чекають на один виклик API
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+                version = self._versions.get(telegram_id, 0)
+                events = await fetch()
+                # Якщо під час запиту подію змінили, результат уже застарів
+                if self._versions.get(telegram_id, 0) == version:
+                    self._store(key, events)
+                return events
+        finally:
+            # Замок потрібен лише поки на нього хтось чекає
+            remaining = self._lock_users[key] - 1
+            if remaining:
+                self._lock_users[key] = remaining
+            else:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    def invalidate(self, telegram_id: int) -> None:
+        self._versions[telegram_id] = self._versions.get(telegram_id, 0) + 1
+        for key in [key for key in self._entries if key[0] == telegram_id]:
+            del self._entries[key]
+
+    def _store(self, key: AgendaKey, events: list[_T]) -> None:
+        # Прострочені записи інших ключів прибираємо тут, бо повторно їх можуть і не запитати
+        now = time.monotonic()
+        for expired in [cached_key for cached_key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[expired]
+        self._entries[key] = (now + self.ttl_seconds, events)
+
+    def _lookup(self, key: AgendaKey) -> list[_T] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, events = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return events
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Any, Iterable
-from zoneinfo import ZoneInfo
 
 from app.config.settings import Settings, get_settings
 from app.schemas.calendar import CalendarEvent
 from app.services.google_calendar import GoogleCalendarService
 
+EventInterval = tuple[datetime, datetime]
+
 
 @dataclass(slots=True)
 class CategoryStat:
@@ -29,6 +32,7 @@ class AnalyticsSnapshot:
     habit_sessions: int
     series_blocks: int
     recommendations: list[str]
+    day_totals: dict[str, float] = field(default_factory=dict)
 
 
 class AnalyticsService:
@@ -49,8 +53,7 @@ class AnalyticsService:
         self.calendar = calendar_service or GoogleCalendarService(settings=self.settings)
 
     async def compute_snapshot(self, telegram_id: int, days: int = 7) -> AnalyticsSnapshot:
-        tz = ZoneInfo(self.settings.timezone)
-        now = datetime.now(tz)
+        now = datetime.now(self.settings.tzinfo)
         start = now - timedelta(days=days)
         end = now
 
@@ -61,30 +64,25 @@ class AnalyticsService:
             max_results=250,
         )
 
-        day_totals: dict[str, float] = {}
-        category_totals: dict[str, float] = {}
+        minutes_by_day: defaultdict[date, float] = defaultdict(float)
+        category_minutes: defaultdict[str, float] = defaultdict(float)
         total_minutes = 0.0
         block_lengths: list[float] = []
         habit_sessions = 0
         series_blocks = 0
 
         for item in events:
-            start_dt = _extract_datetime(item.start)
-            end_dt = _extract_datetime(item.end)
-            if not start_dt or not end_dt:
+            interval = normalize_event(item)
+            if interval is None:
                 continue
+            start_dt, end_dt = interval
             duration = (end_dt - start_dt).total_seconds() / 60
-            if duration <= 0:
-                continue
 
             total_minutes += duration
             block_lengths.append(duration)
 
-            day_key = start_dt.strftime("%a %d.%m")
-            day_totals[day_key] = day_totals.get(day_key, 0.0) + duration / 60
-
-            category_label = self._detect_category(item)
-            category_totals[category_label] = category_totals.get(category_label, 0.0) + duration / 60
+            minutes_by_day[start_dt.date()] += duration
+            category_minutes[self._detect_category(item)] += duration
 
             description = (item.description or "").lower() if item.description else ""
             summary = (item.summary or "").lower()
@@ -93,6 +91,8 @@ class AnalyticsService:
             if "series:" in description or summary.startswith("[series"):
                 series_blocks += 1
 
+        day_totals = _label_day_totals(minutes_by_day)
+        category_totals = {label: minutes / 60 for label, minutes in category_minutes.items()}
         total_hours = round(total_minutes / 60, 1)
         possible_hours = days * 24
         busy_ratio = min(1.0, total_hours / possible_hours) if possible_hours else 0.0
@@ -129,6 +129,7 @@ class AnalyticsService:
             habit_sessions=habit_sessions,
             series_blocks=series_blocks,
             recommendations=recommendations,
+            day_totals=day_totals,
         )
 
     def _detect_category(self, event: CalendarEvent | dict[str, Any]) -> str:
@@ -174,6 +175,50 @@ class AnalyticsService:
         return hints
 
 
+def normalize_event(event: CalendarEvent | dict[str, Any]) -> EventInterval | None:
+    if isinstance(event, CalendarEvent):
+        start_payload = event.start
+        end_payload = event.end
+    else:
+        start_payload = event.get("start")
+        end_payload = event.get("end")
+
+    start_dt = _extract_datetime(start_payload)
+    end_dt = _extract_datetime(end_payload)
+    if not start_dt or not end_dt or end_dt <= start_dt:
+        return None
+    return start_dt, end_dt
+
+
+def event_intervals(events: Iterable[CalendarEvent | dict[str, Any]]) -> list[EventInterval]:
+    intervals: list[EventInterval] = []
+    for event in events:
+        interval = normalize_event(event)
+        if interval is not None:
+            intervals.append(interval)
+    return intervals
+
+
+def build_day_totals(intervals: Iterable[EventInterval]) -> dict[str, float]:
+    # Групуємо хвилини за датою, а підписи форматуємо лише один раз на день
+    minutes_by_day: defaultdict[date, float] = defaultdict(float)
+    for start_dt, end_dt in intervals:
+        minutes_by_day[start_dt.date()] += (end_dt - start_dt).total_seconds() / 60
+    return _label_day_totals(minutes_by_day)
+
+
+def _label_day_totals(minutes_by_day: dict[date, float]) -> dict[str, float]:
+    day_minutes: defaultdict[str, float] = defaultdict(float)
+    for day, minutes in minutes_by_day.items():
+        day_minutes[_day_label(day)] += minutes
+    return {day_key: minutes / 60 for day_key, minutes in day_minutes.items()}
+
+
+@lru_cache(maxsize=64)
+def _day_label(day: date) -> str:
+    return day.strftime("%a %d.%m")
+
+
 def _extract_datetime(payload: dict[str, Any] | None) -> datetime | None:
     if not payload:
         return None
@@ -3,7 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Iterable
-from zoneinfo import ZoneInfo
 
 from app.config.settings import Settings, get_settings
 from app.services.google_calendar import GoogleCalendarService
@@ -19,7 +18,7 @@ class FreeSlotRequest:
     preferred_end: int | None = None
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class FreeSlot:
     start: datetime
     end: datetime
@@ -36,7 +35,7 @@ class FreeSlotService:
 
     async def find_slots(self, request: FreeSlotRequest, max_suggestions: int = 3) -> list[FreeSlot]:
         busy = await self._fetch_busy_intervals(request.telegram_id, request.date_from, request.date_to)
-        tz = ZoneInfo(self.settings.timezone)
+        tz = self.settings.tzinfo
         duration = timedelta(minutes=request.duration_minutes)
         start_bound = request.date_from.astimezone(tz)
         end_bound = request.date_to.astimezone(tz)
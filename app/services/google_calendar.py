@@ -4,6 +4,7 @@ import asyncio
 import json
 from typing import Any, Iterable
 from datetime import datetime
+from functools import lru_cache
 from uuid import uuid4
 
 from google.auth.transport.requests import Request
@@ -16,6 +17,7 @@ from app.config.settings import Settings, get_settings
 from app.db.base import init_db
 from app.db.repository import UserRepository, get_session
 from app.schemas.calendar import CalendarEvent, RemindersConfig, ReminderOverride
+from app.services.agenda_cache import AgendaCache
 from app.services.async_executor import run_in_executor
 
 SCOPES = [
@@ -27,6 +29,8 @@ SCOPES = [
 AUTH_URI = "https://accounts.google.com/o/oauth2/auth"
 TOKEN_URI = "https://oauth2.googleapis.com/token"
 USERINFO_SERVICE = ("oauth2", "v2")
+CONFLICT_CACHE_TTL_SECONDS = 10.0
+FREE_SLOT_PREVIEW_TTL_SECONDS = 180.0
 
 
 class GoogleCalendarService:
@@ -38,6 +42,11 @@ class GoogleCalendarService:
     ) -> None:
         self.settings = settings or get_settings()
         self.user_repository = user_repository or UserRepository()
+        self.agenda_cache: AgendaCache[CalendarEvent] = AgendaCache()
+        # Перевірки конфліктів повторюються в межах одного сценарію редагування
+        self.conflict_cache: AgendaCache[CalendarEvent] = AgendaCache(ttl_seconds=CONFLICT_CACHE_TTL_SECONDS)
+        # Попередній перегляд звички перераховується при кожній зміні часу доби
+        self.free_slot_cache: AgendaCache[Any] = AgendaCache(ttl_seconds=FREE_SLOT_PREVIEW_TTL_SECONDS)
         init_db()
 
 
@@ -61,13 +70,16 @@ class GoogleCalendarService:
         credentials = self.ensure_credentials(telegram_id)
         return build("calendar", "v3", credentials=credentials)
 
+    async def prepare_credentials(self, telegram_id: int) -> None:
+        # Перед паралельними викликами оновлюємо токен один раз, а не в кожному потоці
+        await run_in_executor(self.ensure_credentials, telegram_id)
+
     async def list_upcoming_events(
         self, telegram_id: int, *, max_results: int = 5
     ) -> list[CalendarEvent]:
         def _sync() -> list[CalendarEvent]:
-            from zoneinfo import ZoneInfo
             service = self.get_calendar_client(telegram_id)
-            now = datetime.now(ZoneInfo(self.settings.timezone))
+            now = datetime.now(self.settings.tzinfo)
             result = (
                 service.events()
                 .list(
@@ -179,7 +191,9 @@ class GoogleCalendarService:
             )
             return CalendarEvent.from_api(created_raw)
         
-        return await run_in_executor(_sync)
+        created = await run_in_executor(_sync)
+        self._invalidate_caches(telegram_id)
+        return created
 
     async def update_event(
         self,
@@ -196,11 +210,16 @@ class GoogleCalendarService:
         color_id: str | None = None,
         reminders: RemindersConfig | Iterable[ReminderOverride] | list[dict[str, Any]] | None = None,
         clear_reminders: bool = False,
+        current: dict[str, Any] | None = None,
         **extra: Any,
     ) -> CalendarEvent:
         def _sync() -> CalendarEvent:
             service = self.get_calendar_client(telegram_id)
-            event = service.events().get(calendarId="primary", eventId=event_id).execute()
+            # Якщо викликач щойно отримав подію, не робимо повторний GET перед оновленням
+            if current is not None:
+                event = dict(current)
+            else:
+                event = service.events().get(calendarId="primary", eventId=event_id).execute()
 
             if summary is not None:
                 event["summary"] = summary
@@ -241,7 +260,14 @@ class GoogleCalendarService:
             )
             return CalendarEvent.from_api(updated_raw)
         
-        return await run_in_executor(_sync)
+        updated = await run_in_executor(_sync)
+        self._invalidate_caches(telegram_id)
+        return updated
+
+    def _invalidate_caches(self, telegram_id: int) -> None:
+        self.agenda_cache.invalidate(telegram_id)
+        self.conflict_cache.invalidate(telegram_id)
+        self.free_slot_cache.invalidate(telegram_id)
 
     def build_conference_data(self) -> dict[str, Any]:
         return {
@@ -261,6 +287,7 @@ class GoogleCalendarService:
             service.events().delete(calendarId="primary", eventId=event_id).execute()
         
         await run_in_executor(_sync)
+        self._invalidate_caches(telegram_id)
 
     async def get_event(
         self,
@@ -322,9 +349,8 @@ class GoogleCalendarService:
         )
 
     def _load_credentials(self, credentials_json: str) -> Credentials | None:
-        try:
-            data = json.loads(credentials_json)
-        except json.JSONDecodeError:
+        data = _decode_credentials_json(credentials_json)
+        if data is None:
             return None
         return Credentials.from_authorized_user_info(data, scopes=SCOPES)
 
@@ -340,3 +366,12 @@ class GoogleCalendarService:
                 "redirect_uris": [f"http://localhost:{self.settings.google_oauth_port}/"],
             }
         }
+
+
+# Облікові дані читаються перед кожним викликом API, а змінюються лише після оновлення токена
+@lru_cache(maxsize=128)
+def _decode_credentials_json(credentials_json: str) -> dict[str, Any] | None:
+    try:
+        return json.loads(credentials_json)
+    except json.JSONDecodeError:
+        return None
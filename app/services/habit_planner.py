@@ -116,9 +116,8 @@ class HabitPlannerService:
         if not slots:
             return "Не вдалося знайти вільні слоти для звички на наступний тиждень. Спробуй пізніше."
 
-        created_events = []
         for slot in slots:
-            event = await self.calendar_service.create_event(
+            await self.calendar_service.create_event(
                 telegram_id,
                 summary=habit_setup.name,
                 start={
@@ -131,14 +130,11 @@ class HabitPlannerService:
                 },
                 description="Сесія звички",
             )
-            created_events.append(event)
 
+        # Час сесій уже відомий зі слотів, тож не розбираємо його назад з відповіді API
         lines = ["✅ Заплановано сесії звички:"]
-        for event in created_events:
-            start_str = event.start.get("dateTime") or event.start.get("date")
-            if start_str:
-                dt = datetime.fromisoformat(start_str)
-                lines.append(f"• {habit_setup.name} — {dt:%d.%m %H:%M}")
+        for start_dt, _ in slots:
+            lines.append(f"• {habit_setup.name} — {start_dt:%d.%m %H:%M}")
         lines.append("\nВони додані до твого Google Calendar.")
         return "\n".join(lines)
 